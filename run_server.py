@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 """
 Script to run the FastAPI YouTube Audio Downloader server.
+
+Environment variables:
+    DEV: Set to 1 to enable auto-reload (forces a single worker)
+    WEB_CONCURRENCY: Number of worker processes (default: 1)
 """
 
+import os
 import uvicorn
 import sys
 from pathlib import Path
@@ -12,10 +17,18 @@ src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
 if __name__ == "__main__":
+    dev_mode = bool(int(os.environ.get("DEV", "0")))
+    
+    # Download progress is tracked in-process, so scale out explicitly via WEB_CONCURRENCY
+    workers = 1 if dev_mode else int(os.environ.get("WEB_CONCURRENCY", "1"))
+    
     uvicorn.run(
         "api.app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,  # Enable auto-reload for development
+        reload=dev_mode,  # reload is incompatible with multiple workers
+        workers=workers,
+        loop="auto",  # uvloop when installed
+        http="auto",  # httptools when installed
         log_level="info"
     )
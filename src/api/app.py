@@ -2,15 +2,37 @@
 FastAPI application entry point for YouTube Audio Downloader.
 """
 
+import os
+import re
+import asyncio
+import gzip
+import hashlib
+import stat
 import logging
+import mimetypes
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import anyio
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.types import Scope
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 from .routes import router
+from .database import get_database
 
 # Setup logging
 logging.basicConfig(
@@ -19,20 +41,262 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Text assets worth storing precompressed next to the original file
+PRECOMPRESSED_SUFFIXES = frozenset({'.css', '.js', '.svg', '.html'})
+
+# Preferred order when the client accepts several encodings
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Small, always-requested files (relative to static_dir) kept in memory
+HOT_STATIC_FILES = ('css/style.css', 'js/app.js')
+
+# In-memory responses: cache key (+ encoding suffix) -> (body, etag, content type)
+STATIC_CACHE: Dict[str, Tuple[bytes, str, str]] = {}
+INDEX_CACHE_KEY = "/"
+
+# Markers of Jinja syntax; templates without them are served byte-for-byte
+JINJA_TAGS = (b'{{', b'{%', b'{#')
+
+# Responses GZipMiddleware must pass through untouched: already-compressed
+# media, and SSE streams, which compression would buffer
+GZIP_EXCLUDED_CONTENT_TYPES = (
+    'audio/*', 'video/*', 'image/png', 'image/jpeg', 'image/gif', 'image/webp',
+    'font/woff2', 'application/zip', 'application/gzip', 'text/event-stream',
+)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (native datetime support, much faster than json)."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _precompress_encoders():
+    """Return (file suffix, compress function) pairs for available encodings."""
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.insert(0, ('.br', lambda data: brotli.compress(data, quality=11)))
+    return encoders
+
+
+def precompress_static_assets(directory: Path) -> int:
+    """
+    Write .gz (and .br when brotli is installed) siblings for text assets.
+    
+    Siblings are only rewritten when missing or older than the source file.
+    
+    Args:
+        directory: Static files directory
+        
+    Returns:
+        Number of compressed files written
+    """
+    encoders = _precompress_encoders()
+    written = 0
+    
+    for path in directory.rglob('*'):
+        if path.suffix not in PRECOMPRESSED_SUFFIXES or not path.is_file():
+            continue
+        
+        source_mtime = path.stat().st_mtime
+        data = None
+        for suffix, compress in encoders:
+            target = path.with_name(path.name + suffix)
+            if target.exists() and target.stat().st_mtime >= source_mtime:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            target.write_bytes(compress(data))
+            written += 1
+    
+    return written
+
+
+def _accepted_encodings(request_headers: Headers) -> set:
+    """Parse the Accept-Encoding request header into a set of encoding names."""
+    return {
+        token.split(';')[0].strip()
+        for token in request_headers.get('accept-encoding', '').split(',')
+    }
+
+
+def _make_etag(body: bytes) -> str:
+    """Build a strong ETag from response content."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def cache_static_content(key: str, body: bytes, media_type: str) -> None:
+    """
+    Store a body and its compressed variants in STATIC_CACHE.
+    
+    Args:
+        key: Cache key (path relative to static_dir, or INDEX_CACHE_KEY)
+        body: Uncompressed content
+        media_type: Content-Type header value
+    """
+    STATIC_CACHE[key] = (body, _make_etag(body), media_type)
+    for suffix, compress in _precompress_encoders():
+        compressed = compress(body)
+        STATIC_CACHE[key + suffix] = (compressed, _make_etag(compressed), media_type)
+
+
+def get_cached_response(key: str, request_headers: Headers,
+                        cache_control: Optional[str] = None) -> Optional[Response]:
+    """
+    Build a response from STATIC_CACHE, honouring Accept-Encoding and If-None-Match.
+    
+    Args:
+        key: Cache key
+        request_headers: Incoming request headers
+        cache_control: Optional Cache-Control header value
+        
+    Returns:
+        Response, or None if the key is not cached
+    """
+    if key not in STATIC_CACHE:
+        return None
+    
+    accepted = _accepted_encodings(request_headers)
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS + ((None, ''),):
+        if encoding is not None and encoding not in accepted:
+            continue
+        entry = STATIC_CACHE.get(key + suffix)
+        if entry is None:
+            continue
+        
+        body, etag, media_type = entry
+        headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        if cache_control is not None:
+            headers["Cache-Control"] = cache_control
+        
+        if etag in request_headers.get('if-none-match', ''):
+            return NotModifiedResponse(Headers(headers))
+        return Response(content=body, media_type=media_type, headers=headers)
+    
+    return None
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with Cache-Control headers, in-memory hot files and precompressed assets."""
+    
+    # Fingerprinted assets (e.g. app.3f9a1c2b.js) never change under the same name
+    HASHED_ASSET_PATTERN = re.compile(r'\.[0-9a-fA-F]{8,}\.(?:js|css|woff2)$')
+    HASHED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+    
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        Serve a static file and attach a Cache-Control header.
+        
+        Args:
+            path: Requested path relative to the static directory
+            scope: ASGI scope
+            
+        Returns:
+            Static file response
+        """
+        response = get_cached_response(path, Headers(scope=scope))
+        if response is None:
+            response = await self._get_precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            if self.HASHED_ASSET_PATTERN.search(path):
+                response.headers["Cache-Control"] = self.HASHED_CACHE_CONTROL
+            else:
+                response.headers["Cache-Control"] = self.DEFAULT_CACHE_CONTROL
+        return response
+    
+    async def _get_precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        """Serve a .br/.gz sibling of the requested file if the client accepts it."""
+        if Path(path).suffix not in PRECOMPRESSED_SUFFIXES:
+            return None
+        
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers)
+        
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=mimetypes.guess_type(path)[0] or 'text/plain',
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        
+        return None
+
+
+def _ensure_asset_directories() -> None:
+    """Create the static and templates directories if they don't exist."""
+    static_dir.mkdir(parents=True, exist_ok=True)
+    templates_dir.mkdir(parents=True, exist_ok=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and static caches on startup, clean up on shutdown."""
+    db = get_database()
+    app.state.db = db
+    
+    try:
+        await db.initialize()
+        
+        if not (static_dir.is_dir() and templates_dir.is_dir()):
+            await asyncio.to_thread(_ensure_asset_directories)
+        
+        written = precompress_static_assets(static_dir)
+        if written:
+            logger.info(f"Precompressed {written} static asset(s)")
+        
+        load_static_cache()
+        
+        logger.info("Application started successfully")
+    except Exception as e:
+        logger.error(f"Error during startup: {e}")
+    
+    yield
+    
+    await db.close()
+    logger.info("Application shutting down")
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="YouTube Audio Downloader",
     description="Web interface for downloading audio from YouTube videos",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# CORS middleware for development
+# CORS middleware: comma-separated allowlist via CORS_ORIGINS; preflights cached for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=os.environ.get("CORS_ORIGINS", "http://localhost:8000").split(","),
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    max_age=86400,
+)
+
+# Compress text responses (HTML, CSS, JS, JSON), never audio or SSE
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=500,
+    compresslevel=5,
+    exclude_content_types=GZIP_EXCLUDED_CONTENT_TYPES,
 )
 
 # Setup static files and templates
@@ -40,13 +304,8 @@ app.add_middleware(
 static_dir = Path(__file__).parent.parent / "static"
 templates_dir = Path(__file__).parent.parent / "templates"
 
-# Create directories if they don't exist
-static_dir.mkdir(parents=True, exist_ok=True)
-templates_dir.mkdir(parents=True, exist_ok=True)
-
-# Mount static files
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+# Mount static files (directories are created by the lifespan handler if missing)
+app.mount("/static", CachedStaticFiles(directory=str(static_dir), check_dir=False), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory=str(templates_dir))
@@ -55,6 +314,24 @@ templates = Jinja2Templates(directory=str(templates_dir))
 app.include_router(router)
 
 
+def load_static_cache() -> None:
+    """Pre-render the index page and load hot static files into STATIC_CACHE."""
+    STATIC_CACHE.clear()
+    
+    # The index page has no per-request context; skip Jinja entirely when it
+    # contains no template syntax, otherwise render it once
+    index_source = (templates_dir / "index.html").read_bytes()
+    if any(tag in index_source for tag in JINJA_TAGS):
+        index_source = templates.get_template("index.html").render({}).encode('utf-8')
+    cache_static_content(INDEX_CACHE_KEY, index_source, "text/html; charset=utf-8")
+    
+    for name in HOT_STATIC_FILES:
+        path = static_dir / name
+        if path.is_file():
+            media_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            cache_static_content(name, path.read_bytes(), media_type)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """
@@ -66,25 +343,11 @@ async def root(request: Request):
     Returns:
         HTML response
     """
-    return templates.TemplateResponse("index.html", {"request": request})
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup."""
-    try:
-        from .database import get_database
-        db = get_database()
-        await db.initialize()
-        logger.info("Application started successfully")
-    except Exception as e:
-        logger.error(f"Error during startup: {e}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown."""
-    logger.info("Application shutting down")
+    # no-cache: browsers revalidate on every visit and get a 304 while the ETag matches
+    response = get_cached_response(INDEX_CACHE_KEY, request.headers, cache_control="no-cache")
+    if response is not None:
+        return response
+    return templates.TemplateResponse(request, "index.html")
 
 
 if __name__ == "__main__":
@@ -2,12 +2,12 @@
 Database module for storing download history using SQLite.
 """
 
+import asyncio
 import aiosqlite
 import logging
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-from .models import HistoryEntry
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,39 @@ logger = logging.getLogger(__name__)
 class Database:
     """SQLite database manager for download history."""
     
+    # Inserts arriving within this window (seconds) share one transaction
+    INSERT_BATCH_WINDOW = 0.01
+    INSERT_BATCH_SIZE = 64
+    
+    # Local time, matching the format of rows written before the column had a default
+    TIMESTAMP_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+    
+    # download_date is filled in by SQLite; it stays in the column list so
+    # tables created before the DEFAULT existed keep working
+    INSERT_SQL = f"""
+        INSERT INTO downloads 
+        (url, title, filename, download_date, duration, uploader, file_size, video_id)
+        VALUES (?, ?, ?, {TIMESTAMP_SQL}, ?, ?, ?, ?)
+    """
+    
+    # Applied on every new connection; journal_mode=WAL persists in the file,
+    # the others are per-connection settings
+    CONNECTION_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",  # 256 MB
+        "PRAGMA cache_size=-20000",  # 20 MB
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA wal_autocheckpoint=1000",
+    )
+    
+    # Rows never change once written, so lookups by id can be cached until deleted
+    BY_ID_CACHE_SIZE = 512
+    
+    # Columns needed to list history entries
+    HISTORY_FIELDS = ("id", "title", "filename", "download_date", "duration", "uploader", "file_size")
+    HISTORY_COLUMNS = ", ".join(HISTORY_FIELDS)
+    
     def __init__(self, db_path: Optional[Path] = None):
         """
         Initialize database.
@@ -24,20 +57,37 @@ class Database:
         """
         self.db_path = db_path or Path("history.db")
         self._initialized = False
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._init_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._insert_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._by_id_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # Bumped by every delete, so a lookup that raced one does not cache its row
+        self._delete_generation = 0
     
     async def initialize(self):
-        """Initialize database and create tables if they don't exist."""
+        """Open the shared connection and create tables if they don't exist."""
         if self._initialized:
             return
         
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
+        async with self._init_lock:
+            if self._initialized:
+                return
+            
+            db = await aiosqlite.connect(self.db_path)
+            db.row_factory = aiosqlite.Row
+            
+            for pragma in self.CONNECTION_PRAGMAS:
+                await db.execute(pragma)
+            
+            await db.execute(f"""
                 CREATE TABLE IF NOT EXISTS downloads (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     url TEXT NOT NULL,
                     title TEXT NOT NULL,
                     filename TEXT NOT NULL,
-                    download_date TIMESTAMP NOT NULL,
+                    download_date TIMESTAMP NOT NULL DEFAULT ({self.TIMESTAMP_SQL}),
                     duration TEXT,
                     uploader TEXT,
                     file_size INTEGER,
@@ -48,11 +98,33 @@ class Database:
                 CREATE INDEX IF NOT EXISTS idx_download_date 
                 ON downloads(download_date DESC)
             """)
+            # Lets get_stats aggregate from the index alone
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_file_size 
+                ON downloads(file_size)
+            """)
             await db.commit()
+            
+            self._conn = db
+            self._insert_queue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._writer_loop())
+            self._initialized = True
         
-        self._initialized = True
         logger.info(f"Database initialized at {self.db_path}")
     
+    async def close(self):
+        """Flush pending inserts and close the shared connection."""
+        if self._writer_task is not None:
+            # None tells the writer to stop once earlier inserts are written
+            await self._insert_queue.put(None)
+            await self._writer_task
+            self._writer_task = None
+        
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+        self._initialized = False
+    
     async def add_download(self, url: str, title: str, filename: str,
                           duration: Optional[str] = None,
                           uploader: Optional[str] = None,
@@ -75,37 +147,139 @@ class Database:
         """
         await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("""
-                INSERT INTO downloads 
-                (url, title, filename, download_date, duration, uploader, file_size, video_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (url, title, filename, datetime.now(), duration, uploader, file_size, video_id))
-            await db.commit()
-            return cursor.lastrowid
+        row = (url, title, filename, duration, uploader, file_size, video_id)
+        future = asyncio.get_running_loop().create_future()
+        await self._insert_queue.put((row, future))
+        return await future
+    
+    async def _writer_loop(self):
+        """Coalesce queued inserts into batched transactions."""
+        while True:
+            item = await self._insert_queue.get()
+            if item is None:
+                return
+            
+            # Give concurrent inserts a moment to join this transaction
+            await asyncio.sleep(self.INSERT_BATCH_WINDOW)
+            
+            batch = [item]
+            stop = False
+            while len(batch) < self.INSERT_BATCH_SIZE and not self._insert_queue.empty():
+                item = self._insert_queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                # Never let one batch kill the writer; later inserts would wait forever
+                logger.error(f"Unexpected error in download writer: {e}")
+                self._fail_batch(batch, e)
+            if stop:
+                return
     
-    async def get_history(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+    async def _write_batch(self, batch: List[tuple]):
+        """
+        Insert a batch of rows in one transaction and resolve their futures.
+        
+        Args:
+            batch: List of (row, future) pairs
+        """
+        rows = [row for row, _ in batch]
+        
+        try:
+            async with self._write_lock:
+                try:
+                    await self._conn.executemany(self.INSERT_SQL, rows)
+                    async with self._conn.execute("SELECT last_insert_rowid()") as cursor:
+                        last_id = (await cursor.fetchone())[0]
+                    await self._conn.commit()
+                except Exception:
+                    # Roll back while still holding the lock, so a concurrent
+                    # delete's uncommitted statement is not rolled back with us
+                    try:
+                        await self._conn.rollback()
+                    except Exception as rollback_error:
+                        logger.error(f"Error rolling back download batch: {rollback_error}")
+                    raise
+        except Exception as e:
+            logger.error(f"Error writing download batch: {e}")
+            self._fail_batch(batch, e)
+            return
+        
+        # AUTOINCREMENT ids within one locked transaction are consecutive
+        first_id = last_id - len(rows) + 1
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(first_id + i)
+    
+    @staticmethod
+    def _fail_batch(batch: List[tuple], error: Exception):
+        """Fail every still-pending future of a batch with error."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+    
+    async def get_history(self, limit: int = 50, offset: int = 0,
+                          before_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get download history.
         
+        Pass the id of the last entry of the previous page as before_id for
+        keyset pagination; offset is kept for backward compatibility.
+        
         Args:
             limit: Maximum number of records to return
-            offset: Number of records to skip
+            offset: Number of records to skip (ignored when before_id is given)
+            before_id: Return only entries older than this entry (or, if it
+                no longer exists, entries with a smaller id)
             
         Returns:
             List of download history entries
         """
         await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute("""
-                SELECT * FROM downloads 
-                ORDER BY download_date DESC 
+        if before_id is not None:
+            async with self._conn.execute("""
+                SELECT download_date FROM downloads WHERE id = ?
+            """, (before_id,)) as cursor:
+                cursor_row = await cursor.fetchone()
+            
+            if cursor_row is not None:
+                query = f"""
+                    SELECT {self.HISTORY_COLUMNS} FROM downloads 
+                    WHERE (download_date, id) < (?, ?)
+                    ORDER BY download_date DESC, id DESC 
+                    LIMIT ?
+                """
+                params = (cursor_row[0], before_id, limit)
+            else:
+                # The cursor entry was deleted; ids grow with insertion order,
+                # so continue with the entries added before it
+                query = f"""
+                    SELECT {self.HISTORY_COLUMNS} FROM downloads 
+                    WHERE id < ?
+                    ORDER BY download_date DESC, id DESC 
+                    LIMIT ?
+                """
+                params = (before_id, limit)
+        else:
+            query = f"""
+                SELECT {self.HISTORY_COLUMNS} FROM downloads 
+                ORDER BY download_date DESC, id DESC 
                 LIMIT ? OFFSET ?
-            """, (limit, offset)) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+            """
+            params = (limit, offset)
+        
+        async with self._conn.execute(query, params) as cursor:
+            # Plain tuples zipped with a fixed field list are cheaper than dict(Row)
+            cursor.row_factory = None
+            rows = await cursor.fetchall()
+        
+        fields = self.HISTORY_FIELDS
+        return [dict(zip(fields, row)) for row in rows]
     
     async def get_download_by_id(self, download_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -117,15 +291,30 @@ class Database:
         Returns:
             Download entry or None if not found
         """
+        cached = self._by_id_cache.get(download_id)
+        if cached is not None:
+            self._by_id_cache.move_to_end(download_id)
+            return dict(cached)
+        
         await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute("""
-                SELECT * FROM downloads WHERE id = ?
-            """, (download_id,)) as cursor:
-                row = await cursor.fetchone()
-                return dict(row) if row else None
+        generation = self._delete_generation
+        async with self._conn.execute("""
+            SELECT * FROM downloads WHERE id = ?
+        """, (download_id,)) as cursor:
+            row = await cursor.fetchone()
+        
+        if not row:
+            return None
+        
+        entry = dict(row)
+        if generation != self._delete_generation:
+            # A delete ran during the SELECT and may have removed this row
+            return dict(entry)
+        self._by_id_cache[download_id] = entry
+        if len(self._by_id_cache) > self.BY_ID_CACHE_SIZE:
+            self._by_id_cache.popitem(last=False)
+        return dict(entry)
     
     async def delete_download(self, download_id: int) -> bool:
         """
@@ -139,9 +328,11 @@ class Database:
         """
         await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("DELETE FROM downloads WHERE id = ?", (download_id,))
-            await db.commit()
+        async with self._write_lock:
+            cursor = await self._conn.execute("DELETE FROM downloads WHERE id = ?", (download_id,))
+            await self._conn.commit()
+            self._delete_generation += 1
+            self._by_id_cache.pop(download_id, None)
             return cursor.rowcount > 0
     
     async def get_stats(self) -> Dict[str, Any]:
@@ -153,20 +344,17 @@ class Database:
         """
         await self.initialize()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # Total downloads
-            async with db.execute("SELECT COUNT(*) FROM downloads") as cursor:
-                total = (await cursor.fetchone())[0]
-            
-            # Total file size
-            async with db.execute("SELECT SUM(file_size) FROM downloads WHERE file_size IS NOT NULL") as cursor:
-                total_size = (await cursor.fetchone())[0] or 0
-            
-            return {
-                "total_downloads": total,
-                "total_size_bytes": total_size,
-                "total_size_mb": round(total_size / (1024 * 1024), 2) if total_size else 0
-            }
+        # Total downloads and total file size in a single scan
+        async with self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM downloads"
+        ) as cursor:
+            total, total_size = await cursor.fetchone()
+        
+        return {
+            "total_downloads": total,
+            "total_size_bytes": total_size,
+            "total_size_mb": round(total_size / (1024 * 1024), 2) if total_size else 0
+        }
 
 
 # Global database instance
@@ -2,18 +2,31 @@
 Pydantic models for API request/response schemas.
 """
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, ConfigDict, HttpUrl
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 
+# Models are never mutated after construction, so skip assignment validation
+MODEL_CONFIG = ConfigDict(
+    frozen=True,
+    extra="ignore",
+    validate_assignment=False,
+    arbitrary_types_allowed=False
+)
+
+
 class DownloadRequest(BaseModel):
     """Request model for download endpoint."""
+    model_config = MODEL_CONFIG
+    
     url: str
 
 
 class VideoInfo(BaseModel):
     """Response model for video information."""
+    model_config = MODEL_CONFIG
+    
     title: str
     uploader: str
     duration: Optional[str] = None
@@ -31,6 +44,8 @@ class VideoInfo(BaseModel):
 
 class DownloadResponse(BaseModel):
     """Response model for download initiation."""
+    model_config = MODEL_CONFIG
+    
     task_id: str
     message: str
     url: str
@@ -38,6 +53,8 @@ class DownloadResponse(BaseModel):
 
 class ProgressUpdate(BaseModel):
     """Model for progress updates via SSE."""
+    model_config = MODEL_CONFIG
+    
     task_id: str
     status: str  # 'downloading', 'finished', 'error'
     percentage: Optional[float] = None
@@ -50,8 +67,10 @@ class ProgressUpdate(BaseModel):
 
 class HistoryEntry(BaseModel):
     """Model for download history entry."""
+    model_config = MODEL_CONFIG
+    
     id: int
-    url: str
+    url: Optional[str] = None
     title: str
     filename: str
     download_date: datetime
@@ -62,5 +81,7 @@ class HistoryEntry(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response model."""
+    model_config = MODEL_CONFIG
+    
     error: str
     detail: Optional[str] = None
@@ -2,82 +2,176 @@
 API routes for YouTube Audio Downloader.
 """
 
+import os
+import stat
 import uuid
+import time
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import mimetypes
 import logging
-from pathlib import Path
-from typing import Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
-from fastapi.responses import FileResponse, StreamingResponse
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Depends, Request
+from fastapi.responses import FileResponse
 from sse_starlette.sse import EventSourceResponse
-import json
+import orjson
 
 try:
     from ..config import Config
-    from ..audio_downloader import AudioDownloader, URLValidator
+    from ..audio_downloader import AudioDownloader, URLValidator, parse_youtube_url
     from ..metadata_extractor import MetadataExtractor
 except ImportError:
     from config import Config
-    from audio_downloader import AudioDownloader, URLValidator
+    from audio_downloader import AudioDownloader, URLValidator, parse_youtube_url
     from metadata_extractor import MetadataExtractor
 
 from .models import (
-    DownloadRequest, VideoInfo, DownloadResponse, 
-    ProgressUpdate, HistoryEntry, ErrorResponse
+    DownloadRequest, VideoInfo, DownloadResponse, ProgressUpdate
 )
-from .database import get_database
+from .database import Database
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["api"])
 
-# In-memory task storage for progress tracking
+# In-memory task storage for progress tracking, in creation order.
+# Written from download threads, so all access goes through tasks_lock.
 tasks: Dict[str, Dict[str, Any]] = {}
+tasks_lock = threading.RLock()
+MAX_TASKS = 10_000
+TASK_TTL = 3600
 config = Config()
 downloader = AudioDownloader(config)
 metadata_extractor = MetadataExtractor(config)
-db = get_database()
 
+# Dedicated pool for blocking yt-dlp downloads, separate from the default executor
+DOWNLOAD_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", min(4, os.cpu_count() or 1)))
+download_executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="download")
 
-def progress_callback_wrapper(task_id: str):
+# SSE subscriber queues per task; progress is pushed, not polled.
+# Each queue receives (status, serialized payload) tuples.
+subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+# SSE progress updates are coalesced to ~10 Hz per client
+PROGRESS_INTERVAL = 0.1
+PROGRESS_FIELDS = tuple(ProgressUpdate.model_fields)
+TERMINAL_STATUSES = ('finished', 'error')
+SUBSCRIBER_QUEUE_SIZE = 32
+
+
+def get_db(request: Request) -> Database:
+    """Return the database instance opened by the application lifespan."""
+    return request.app.state.db
+
+
+def create_task(task_id: str, **fields: Any) -> None:
+    """Register a new task, dropping expired or excess tasks first."""
+    now = time.monotonic()
+    with tasks_lock:
+        while tasks:
+            oldest_id = next(iter(tasks))
+            if len(tasks) < MAX_TASKS and tasks[oldest_id]['created_at'] + TASK_TTL > now:
+                break
+            del tasks[oldest_id]
+        tasks[task_id] = {'task_id': task_id, 'created_at': now, **fields}
+
+
+def update_task(task_id: str, **fields: Any) -> None:
+    """Atomically update the state of a task if it still exists."""
+    with tasks_lock:
+        task = tasks.get(task_id)
+        if task is not None:
+            task.update(fields)
+
+
+def find_latest_mp3(directory) -> Optional[Tuple[str, int]]:
+    """Return the name and size of the most recently modified MP3 in a directory."""
+    best_name, best_mtime, best_size = None, -1.0, 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.mp3'):
+                    continue
+                st = entry.stat()
+                if st.st_mtime > best_mtime:
+                    best_name, best_mtime, best_size = entry.name, st.st_mtime, st.st_size
+    except FileNotFoundError:
+        return None
+    return (best_name, best_size) if best_name else None
+
+
+def progress_snapshot(task_id: str) -> Tuple[str, str]:
+    """Build the serialized SSE progress payload for a task from its current state."""
+    with tasks_lock:
+        task = tasks.get(task_id) or {'status': 'error', 'message': 'Task not found'}
+        progress = {field: task.get(field) for field in PROGRESS_FIELDS}
+    progress['task_id'] = task_id
+    progress['status'] = progress['status'] or 'pending'
+    progress['percentage'] = progress['percentage'] or 0
+    return progress['status'], orjson.dumps(progress).decode()
+
+
+def publish_progress(task_id: str):
+    """Push the current progress of a task to its SSE subscribers (event loop only)."""
+    queues = subscribers.get(task_id)
+    if queues:
+        # Serialize once and fan the same string out to every subscriber
+        snapshot = progress_snapshot(task_id)
+        for queue in queues:
+            if queue.full():
+                # Slow client: drop the oldest update. Terminal events are always
+                # the newest, so they are never the ones dropped.
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+
+def progress_callback_wrapper(task_id: str, loop: asyncio.AbstractEventLoop):
     """Create a progress callback for a specific task."""
     def callback(info: Dict[str, Any]):
-        tasks[task_id].update({
-            'status': info.get('status', 'downloading'),
-            'percentage': info.get('percentage', 0),
-            'downloaded': info.get('downloaded', ''),
-            'total': info.get('total', ''),
-            'speed': info.get('speed', ''),
-            'filename': info.get('filename', ''),
-            'message': info.get('message', '')
-        })
+        update_task(
+            task_id,
+            status=info.get('status', 'downloading'),
+            percentage=info.get('percentage', 0),
+            downloaded=info.get('downloaded', ''),
+            total=info.get('total', ''),
+            speed=info.get('speed', ''),
+            filename=info.get('filename', ''),
+            message=info.get('message', '')
+        )
+        # yt-dlp calls this from the download thread
+        loop.call_soon_threadsafe(publish_progress, task_id)
     return callback
 
 
-async def download_task(task_id: str, url: str):
+async def download_task(task_id: str, url: str, db: Database):
     """
     Background task for downloading audio.
     
     Args:
         task_id: Unique task identifier
         url: YouTube URL to download
+        db: Database used to record the download history
     """
     try:
-        tasks[task_id]['status'] = 'downloading'
-        tasks[task_id]['message'] = 'Starting download...'
-        
-        # Create downloader with progress callback
-        progress_callback = progress_callback_wrapper(task_id)
-        task_downloader = AudioDownloader(config, progress_callback)
+        update_task(task_id, status='downloading', message='Starting download...')
+        publish_progress(task_id)
         
-        # Download audio
-        result = task_downloader.download_audio(url)
+        # Download audio off the event loop so progress can be streamed meanwhile
+        loop = asyncio.get_running_loop()
+        progress_callback = progress_callback_wrapper(task_id, loop)
+        result = await loop.run_in_executor(
+            download_executor,
+            partial(downloader.download_audio, url, progress_callback=progress_callback, return_info=True)
+        )
         
         if result['success']:
-            # Extract metadata for history and save to file
+            # Build metadata from the info extracted during the download and save to file
             metadata = None
+            info = result.pop('info', None) or {}
             try:
-                metadata = metadata_extractor.extract_metadata(url)
+                metadata = metadata_extractor.build_metadata(info)
                 video_info = metadata.get('video_info', {})
                 computed = metadata.get('computed', {})
                 
@@ -97,19 +191,17 @@ async def download_task(task_id: str, url: str):
             # Get file size - find the actual downloaded file
             # yt-dlp might modify the filename (e.g., add numbers if file exists)
             expected_filename = result.get('filename', '')
-            file_path = config.paths.downloads_dir / expected_filename
             
-            # If expected file doesn't exist, find the most recent MP3 file
-            if not file_path.exists():
-                mp3_files = list(config.paths.downloads_dir.glob("*.mp3"))
-                if mp3_files:
-                    # Sort by modification time, get most recent
-                    file_path = max(mp3_files, key=lambda p: p.stat().st_mtime)
-                    expected_filename = file_path.name
+            try:
+                file_size = os.stat(os.path.join(config.paths.downloads_dir, expected_filename)).st_size
+            except FileNotFoundError:
+                # If expected file doesn't exist, find the most recent MP3 file
+                file_size = None
+                latest = find_latest_mp3(config.paths.downloads_dir)
+                if latest:
+                    expected_filename, file_size = latest
                     logger.info(f"Found downloaded file: {expected_filename}")
             
-            file_size = file_path.stat().st_size if file_path.exists() else None
-            
             # Add to history
             await db.add_download(
                 url=url,
@@ -121,26 +213,31 @@ async def download_task(task_id: str, url: str):
                 video_id=computed.get('video_id')
             )
             
-            tasks[task_id].update({
-                'status': 'finished',
-                'message': 'Download completed successfully',
-                'filename': expected_filename,
-                'result': result
-            })
+            update_task(
+                task_id,
+                status='finished',
+                message='Download completed successfully',
+                filename=expected_filename,
+                result=result
+            )
         else:
-            tasks[task_id].update({
-                'status': 'error',
-                'message': result.get('error', 'Download failed'),
-                'error': result.get('error')
-            })
+            update_task(
+                task_id,
+                status='error',
+                message=result.get('error', 'Download failed'),
+                error=result.get('error')
+            )
             
     except Exception as e:
         logger.error(f"Download task error: {e}")
-        tasks[task_id].update({
-            'status': 'error',
-            'message': f'Error: {str(e)}',
-            'error': str(e)
-        })
+        update_task(
+            task_id,
+            status='error',
+            message=f'Error: {str(e)}',
+            error=str(e)
+        )
+    finally:
+        publish_progress(task_id)
 
 
 @router.get("/info", response_model=VideoInfo)
@@ -185,7 +282,8 @@ async def get_video_info(url: str = Query(..., description="YouTube video URL"))
 @router.post("/download", response_model=DownloadResponse)
 async def start_download(
     request: DownloadRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    db: Database = Depends(get_db)
 ):
     """
     Start downloading audio from YouTube URL.
@@ -193,27 +291,29 @@ async def start_download(
     Args:
         request: Download request with URL
         background_tasks: FastAPI background tasks
+        db: Database instance
         
     Returns:
         Download response with task_id
     """
-    if not URLValidator.is_valid_youtube_url(request.url):
+    _, normalized_url = parse_youtube_url(request.url)
+    if normalized_url is None:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
     
     # Generate task ID
     task_id = str(uuid.uuid4())
     
     # Initialize task
-    tasks[task_id] = {
-        'task_id': task_id,
-        'url': request.url,
-        'status': 'pending',
-        'percentage': 0,
-        'message': 'Task created'
-    }
+    create_task(
+        task_id,
+        url=request.url,
+        status='pending',
+        percentage=0,
+        message='Task created'
+    )
     
     # Start background download
-    background_tasks.add_task(download_task, task_id, request.url)
+    background_tasks.add_task(download_task, task_id, normalized_url, db)
     
     return DownloadResponse(
         task_id=task_id,
@@ -222,7 +322,14 @@ async def start_download(
     )
 
 
-@router.get("/progress/{task_id}")
+@router.get(
+    "/progress/{task_id}",
+    responses={200: {
+        "model": ProgressUpdate,
+        "description": "SSE stream of progress events",
+        "content": {"text/event-stream": {"schema": {"$ref": "#/components/schemas/ProgressUpdate"}}}
+    }}
+)
 async def get_progress(task_id: str):
     """
     Stream progress updates via Server-Sent Events.
@@ -235,46 +342,53 @@ async def get_progress(task_id: str):
     """
     async def event_generator():
         """Generate SSE events for progress updates."""
-        last_status = None
+        if task_id not in tasks:
+            yield {
+                "event": "error",
+                "data": orjson.dumps({"error": "Task not found"}).decode()
+            }
+            return
         
-        while True:
-            if task_id not in tasks:
-                yield {
-                    "event": "error",
-                    "data": json.dumps({"error": "Task not found"})
-                }
-                break
-            
-            task = tasks[task_id]
-            current_status = task.get('status')
-            
-            # Send update if status changed or periodically
-            if current_status != last_status or current_status == 'downloading':
-                progress = ProgressUpdate(
-                    task_id=task_id,
-                    status=task.get('status', 'pending'),
-                    percentage=task.get('percentage', 0),
-                    downloaded=task.get('downloaded'),
-                    total=task.get('total'),
-                    speed=task.get('speed'),
-                    filename=task.get('filename'),
-                    message=task.get('message')
-                )
-                
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        subscribers.setdefault(task_id, []).append(queue)
+        
+        loop = asyncio.get_running_loop()
+        
+        try:
+            status, data = progress_snapshot(task_id)
+            while True:
                 yield {
                     "event": "progress",
-                    "data": progress.model_dump_json()
+                    "data": data
                 }
-                
-                last_status = current_status
+                last_sent = loop.time()
                 
                 # Stop if finished or error
-                if current_status in ['finished', 'error']:
+                if status in TERMINAL_STATUSES:
                     # Clean up after a delay
                     await asyncio.sleep(2)
                     break
-            
-            await asyncio.sleep(0.5)  # Update every 500ms
+                
+                # Wait for the next push, then coalesce into one write per
+                # PROGRESS_INTERVAL, keeping only the latest; terminal events
+                # are written immediately
+                status, data = await queue.get()
+                while status not in TERMINAL_STATUSES:
+                    remaining = last_sent + PROGRESS_INTERVAL - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        status, data = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                while not queue.empty():
+                    status, data = queue.get_nowait()
+        finally:
+            queues = subscribers.get(task_id, [])
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                subscribers.pop(task_id, None)
     
     return EventSourceResponse(event_generator())
 
@@ -282,20 +396,24 @@ async def get_progress(task_id: str):
 @router.get("/history")
 async def get_history(
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    before: Optional[int] = Query(None, ge=1, description="ID of the last entry of the previous page"),
+    db: Database = Depends(get_db)
 ):
     """
     Get download history.
     
     Args:
         limit: Maximum number of records
-        offset: Number of records to skip
+        offset: Number of records to skip (ignored when before is given)
+        before: ID of the last entry already received, for keyset pagination
+        db: Database instance
         
     Returns:
         List of download history entries
     """
     try:
-        history = await db.get_history(limit=limit, offset=offset)
+        history = await db.get_history(limit=limit, offset=offset, before_id=before)
         return history
     except Exception as e:
         logger.error(f"Error getting history: {e}")
@@ -315,21 +433,35 @@ async def download_file(filename: str):
     """
     file_path = config.paths.downloads_dir / filename
     
-    if not file_path.exists():
+    # Stat once here and hand the result to FileResponse so it doesn't stat again
+    try:
+        stat_result = os.stat(file_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=404, detail="File not found")
     
+    # Use the real media type (audio/mpeg for MP3s) so compression middleware
+    # leaves the body alone and FileResponse can stream it straight from disk
+    media_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    
     return FileResponse(
         path=file_path,
         filename=filename,
-        media_type='application/octet-stream'
+        media_type=media_type,
+        headers={"Cache-Control": "private, max-age=3600"},
+        stat_result=stat_result
     )
 
 
 @router.get("/stats")
-async def get_stats():
+async def get_stats(db: Database = Depends(get_db)):
     """
     Get download statistics.
     
+    Args:
+        db: Database instance
+    
     Returns:
         Statistics dictionary
     """
@@ -6,32 +6,88 @@ using yt-dlp with progress tracking and error handling.
 """
 
 import re
+import time
+import asyncio
 import logging
+import logging.handlers
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, Callable, Iterable, List, Tuple
 from urllib.parse import urlparse, parse_qs
-import yt_dlp
+
+# yt-dlp takes a noticeable time to import, so functions that need it import
+# it on first use; URL validation and formatting helpers work without it
+if TYPE_CHECKING:
+    import yt_dlp
 try:
     from .config import Config
 except ImportError:
     from config import Config
 
 
+# Characters that are invalid in filenames, mapped to underscores
+_FILENAME_TRANS = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# Configured loggers, keyed by the resolved log file they write to
+_file_loggers: Dict[Path, logging.Logger] = {}
+_file_loggers_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """Keep ``audio_downloader.yt_dlp`` working without importing yt-dlp at import time."""
+    if name == "yt_dlp":
+        import yt_dlp
+        return yt_dlp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class DownloadError(Exception):
     """Custom exception for download errors."""
     pass
 
 
+@lru_cache(maxsize=4096)
+def _match_youtube(url: str) -> Optional[str]:
+    """Return the video ID for a stripped YouTube URL, or None if it does not match."""
+    # Match on ASCII bytes; non-ASCII characters become backslash escapes,
+    # which never match any part of the pattern
+    match = URLValidator.YOUTUBE_PATTERN.match(url.encode('ascii', 'backslashreplace'))
+    return match.group(1).decode('ascii') if match else None
+
+
+def parse_youtube_url(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Validate and normalize a YouTube URL with a single match.
+    
+    Args:
+        url: URL to parse
+        
+    Returns:
+        (video_id, normalized_url), or (None, None) if not a YouTube video URL
+    """
+    if not url or not isinstance(url, str):
+        return None, None
+    
+    video_id = _match_youtube(url.strip())
+    if video_id is None:
+        return None, None
+    return video_id, f"https://www.youtube.com/watch?v={video_id}"
+
+
 class URLValidator:
     """Utility class for validating YouTube URLs."""
     
-    # YouTube URL patterns
-    YOUTUBE_PATTERNS = [
-        r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:www\.)?youtube\.com/embed/([a-zA-Z0-9_-]{11})',
-        r'(?:https?://)?(?:m\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-    ]
+    # YouTube URL patterns (watch, short and embed links) in one compiled bytes regex
+    YOUTUBE_PATTERN = re.compile(
+        rb'(?:https?://)?(?:www\.|m\.)?'
+        rb'(?:youtube\.com/(?:watch\?v=|embed/)|youtu\.be/)'
+        rb'([a-zA-Z0-9_-]{11})'
+    )
+    # The same pattern anchored at each line, for validating many URLs at once
+    YOUTUBE_LINE_PATTERN = re.compile(rb'^' + YOUTUBE_PATTERN.pattern, re.MULTILINE)
     
     @classmethod
     def is_valid_youtube_url(cls, url: str) -> bool:
@@ -44,13 +100,7 @@ class URLValidator:
         Returns:
             True if valid YouTube URL, False otherwise
         """
-        if not url or not isinstance(url, str):
-            return False
-            
-        for pattern in cls.YOUTUBE_PATTERNS:
-            if re.match(pattern, url.strip()):
-                return True
-        return False
+        return parse_youtube_url(url)[0] is not None
     
     @classmethod
     def extract_video_id(cls, url: str) -> Optional[str]:
@@ -63,11 +113,7 @@ class URLValidator:
         Returns:
             Video ID if found, None otherwise
         """
-        for pattern in cls.YOUTUBE_PATTERNS:
-            match = re.match(pattern, url.strip())
-            if match:
-                return match.group(1)
-        return None
+        return _match_youtube(url.strip())
     
     @classmethod
     def normalize_url(cls, url: str) -> str:
@@ -80,25 +126,57 @@ class URLValidator:
         Returns:
             Normalized YouTube URL
         """
-        video_id = cls.extract_video_id(url)
-        if video_id:
-            return f"https://www.youtube.com/watch?v={video_id}"
-        return url
+        return parse_youtube_url(url)[1] or url
+    
+    @classmethod
+    def filter_valid(cls, urls: Iterable[str]) -> List[str]:
+        """
+        Keep the valid YouTube video URLs from a batch, in order.
+        
+        The batch is joined into one buffer and scanned with a single regex
+        pass rather than matching each URL separately.
+        
+        Args:
+            urls: Stripped URLs to validate
+            
+        Returns:
+            The URLs for which is_valid_youtube_url() would return True
+        """
+        urls = list(urls)
+        encoded = [url.encode('ascii', 'backslashreplace') for url in urls]
+        starts = {match.start() for match in cls.YOUTUBE_LINE_PATTERN.finditer(b'\n'.join(encoded))}
+        
+        # Only matches at the start of an input URL count; a URL containing a
+        # newline must not validate through its second line
+        valid = []
+        offset = 0
+        for url, raw in zip(urls, encoded):
+            if offset in starts:
+                valid.append(url)
+            offset += len(raw) + 1
+        return valid
 
 
 class ProgressTracker:
     """Progress tracking for downloads."""
     
-    def __init__(self, callback: Optional[Callable] = None):
+    # Minimum seconds between forwarded 'downloading' ticks; this is the
+    # producer-side complement to the SSE push model in the API
+    MIN_INTERVAL = 0.1
+    
+    def __init__(self, callback: Optional[Callable] = None,
+                 logger: Optional[logging.Logger] = None):
         """
         Initialize progress tracker.
         
         Args:
             callback: Optional callback function for progress updates
+            logger: Optional logger for progress messages (defaults to the module logger)
         """
         self.callback = callback
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger or logging.getLogger(__name__)
         self._current_video = None
+        self._last_emit = 0.0
         
     def hook(self, d: Dict[str, Any]) -> None:
         """
@@ -119,28 +197,38 @@ class ProgressTracker:
     
     def _handle_downloading(self, d: Dict[str, Any]) -> None:
         """Handle downloading status."""
+        # Throttle intermediate ticks; finished/error are always forwarded
+        now = time.monotonic()
+        if now - self._last_emit < self.MIN_INTERVAL:
+            return
+        self._last_emit = now
+        
         filename = d.get('filename', 'Unknown')
         total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
         downloaded_bytes = d.get('downloaded_bytes', 0)
         speed = d.get('speed', 0)
         
         if total_bytes > 0:
+            # Skip all formatting when nobody consumes it
+            log_enabled = self.logger.isEnabledFor(logging.INFO)
+            if not (self.callback or log_enabled):
+                return
+            
             percentage = (downloaded_bytes / total_bytes) * 100
             speed_str = self._format_bytes(speed) + '/s' if speed else 'Unknown'
             
-            progress_info = {
-                'status': 'downloading',
-                'filename': Path(filename).name,
-                'percentage': percentage,
-                'downloaded': self._format_bytes(downloaded_bytes),
-                'total': self._format_bytes(total_bytes),
-                'speed': speed_str
-            }
-            
-            self.logger.info(f"Downloading: {percentage:.1f}% - {speed_str}")
+            if log_enabled:
+                self.logger.info("Downloading: %.1f%% - %s", percentage, speed_str)
             
             if self.callback:
-                self.callback(progress_info)
+                self.callback({
+                    'status': 'downloading',
+                    'filename': Path(filename).name,
+                    'percentage': percentage,
+                    'downloaded': self._format_bytes(downloaded_bytes),
+                    'total': self._format_bytes(total_bytes),
+                    'speed': speed_str
+                })
     
     def _handle_finished(self, d: Dict[str, Any]) -> None:
         """Handle finished status."""
@@ -163,33 +251,38 @@ class ProgressTracker:
         if self.callback:
             self.callback({'status': 'error', 'message': 'Download failed'})
     
+    BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+    
     @staticmethod
     def _format_bytes(bytes_count: int) -> str:
         """Format bytes to human readable format."""
         if not bytes_count:
             return "0 B"
-            
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if bytes_count < 1024.0:
-                return f"{bytes_count:.1f} {unit}"
-            bytes_count /= 1024.0
-        return f"{bytes_count:.1f} TB"
+        
+        # Pick the unit from the bit length instead of dividing in a loop
+        unit = max(0, min((int(bytes_count).bit_length() - 1) // 10, 4))
+        return f"{bytes_count / (1 << (unit * 10)):.1f} {ProgressTracker.BYTE_UNITS[unit]}"
 
 
 class AudioDownloader:
     """Main audio downloader class."""
     
+    # get_video_info results cached per video ID
+    INFO_CACHE_SIZE = 1024
+    INFO_CACHE_TTL = 3600
+    
     def __init__(self, config: Optional[Config] = None, progress_callback: Optional[Callable] = None):
         """
         Initialize AudioDownloader.
         
         Args:
             config: Configuration instance
-            progress_callback: Optional callback for progress updates
+            progress_callback: Optional default callback for progress updates
         """
         self.config = config or Config()
-        self.logger = logging.getLogger(__name__)
-        self.progress_tracker = ProgressTracker(progress_callback)
+        self.progress_callback = progress_callback
+        self._info_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._info_cache_lock = threading.Lock()
         
         # Setup logging
         self._setup_logging()
@@ -199,14 +292,33 @@ class AudioDownloader:
             raise ValueError("Invalid configuration provided")
     
     def _setup_logging(self) -> None:
-        """Setup logging configuration."""
-        log_file = self.config.paths.logs_dir / self.config.logging.log_filename
+        """Setup logging configuration (only once per log file)."""
+        log_file = (self.config.paths.logs_dir / self.config.logging.log_filename).resolve()
+        
+        with _file_loggers_lock:
+            logger = _file_loggers.get(log_file)
+            if logger is None:
+                logger = self._create_logger(log_file)
+                _file_loggers[log_file] = logger
+        self.logger = logger
+    
+    def _create_logger(self, log_file: Path) -> logging.Logger:
+        """Return a new child of the module logger that writes to log_file."""
+        # One child per log file: downloaders sharing a file share its handlers,
+        # while ones with a different logs_dir never write to another's file
+        logger = logging.getLogger(__name__).getChild(str(len(_file_loggers)))
         
         # Configure logger
-        self.logger.setLevel(logging.DEBUG)
-        
-        # File handler
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        logger.setLevel(logging.DEBUG)
+        
+        # File handler, rotated by size and not opened until the first write
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=self.config.logging.max_file_size,
+            backupCount=self.config.logging.backup_count,
+            encoding='utf-8',
+            delay=True
+        )
         file_handler.setLevel(getattr(logging, self.config.logging.file_level))
         
         # Console handler
@@ -222,20 +334,26 @@ class AudioDownloader:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        # Add handlers if not already added (avoid duplicates)
-        handler_names = [type(h).__name__ for h in self.logger.handlers]
-        if 'FileHandler' not in handler_names:
-            self.logger.addHandler(file_handler)
-        if 'StreamHandler' not in handler_names:
-            self.logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        return logger
     
-    def download_audio(self, url: str, output_filename: Optional[str] = None) -> Dict[str, Any]:
+    def download_audio(self, url: str, output_filename: Optional[str] = None,
+                       progress_callback: Optional[Callable] = None,
+                       info: Optional[Dict[str, Any]] = None,
+                       return_info: bool = False) -> Dict[str, Any]:
         """
         Download audio from YouTube URL.
         
         Args:
             url: YouTube video URL
             output_filename: Optional custom output filename
+            progress_callback: Optional callback for this download, overriding
+                the one given at construction
+            info: Optional info dictionary already extracted for this URL
+                (e.g. by MetadataExtractor.extract_info), which saves a fetch
+            return_info: Include the full processed yt-dlp info dictionary
+                under 'info', for callers that build metadata from it
             
         Returns:
             Dictionary with download results
@@ -243,33 +361,35 @@ class AudioDownloader:
         Raises:
             DownloadError: If download fails
         """
-        # Validate URL
-        if not URLValidator.is_valid_youtube_url(url):
+        # Validate and normalize URL
+        _, normalized_url = parse_youtube_url(url)
+        if normalized_url is None:
             raise DownloadError(f"Invalid YouTube URL: {url}")
         
-        # Normalize URL
-        normalized_url = URLValidator.normalize_url(url)
         self.logger.info(f"Starting download for: {normalized_url}")
+        import yt_dlp
         
         try:
             # Get YT-DLP options
             ydl_opts = self._get_ydl_options(output_filename)
             
             # Add progress hook
-            ydl_opts['progress_hooks'] = [self.progress_tracker.hook]
+            progress_tracker = ProgressTracker(progress_callback or self.progress_callback, self.logger)
+            ydl_opts['progress_hooks'] = [progress_tracker.hook]
             
             # Download
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Extract info first
-                info = ydl.extract_info(normalized_url, download=False)
+                # Extract info first, unless the caller already has it
+                if info is None:
+                    info = ydl.extract_info(normalized_url, download=False)
                 
                 # Log video info
                 self.logger.info(f"Video title: {info.get('title', 'Unknown')}")
                 self.logger.info(f"Duration: {info.get('duration', 'Unknown')} seconds")
                 self.logger.info(f"Uploader: {info.get('uploader', 'Unknown')}")
                 
-                # Download the video
-                ydl.download([normalized_url])
+                # Download from the extracted info instead of fetching the page again
+                info = ydl.process_ie_result(info, download=True)
                 
                 # Prepare result
                 result = {
@@ -281,6 +401,8 @@ class AudioDownloader:
                     'output_dir': str(self.config.paths.downloads_dir),
                     'filename': self._get_output_filename(info, output_filename)
                 }
+                if return_info:
+                    result['info'] = info
                 
                 self.logger.info("Download completed successfully")
                 return result
@@ -307,6 +429,8 @@ class AudioDownloader:
             List of download results
         """
         results = []
+        successful = 0
+        failed = 0
         
         for i, url in enumerate(urls, 1):
             self.logger.info(f"Processing video {i}/{len(urls)}: {url}")
@@ -314,6 +438,10 @@ class AudioDownloader:
             try:
                 result = self.download_audio(url)
                 results.append(result)
+                if result.get('success'):
+                    successful += 1
+                else:
+                    failed += 1
                 
             except DownloadError as e:
                 error_result = {
@@ -322,6 +450,7 @@ class AudioDownloader:
                     'error': str(e)
                 }
                 results.append(error_result)
+                failed += 1
                 
                 if stop_on_error:
                     self.logger.error("Stopping batch download due to error")
@@ -329,7 +458,72 @@ class AudioDownloader:
                 else:
                     self.logger.warning(f"Continuing batch download after error: {e}")
         
-        self.logger.info(f"Batch download completed. {len([r for r in results if r.get('success')])} successful, {len([r for r in results if not r.get('success')])} failed")
+        self.logger.info(f"Batch download completed. {successful} successful, {failed} failed")
+        return results
+    
+    async def download_batch_async(self, urls: List[str], stop_on_error: bool = False,
+                                   max_parallel: int = 4,
+                                   executor: Optional[Executor] = None) -> List[Dict[str, Any]]:
+        """
+        Download multiple videos concurrently.
+        
+        Args:
+            urls: List of YouTube URLs
+            stop_on_error: Whether to stop on first error; downloads already
+                running in the executor still finish but their results are dropped
+            max_parallel: Maximum number of simultaneous downloads
+            executor: Executor for the blocking downloads (default: the loop's)
+            
+        Returns:
+            List of download results, in URL order, for the downloads that ran
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_parallel)
+        
+        async def download_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                self.logger.info(f"Processing video: {url}")
+                return await loop.run_in_executor(executor, self.download_audio, url)
+        
+        jobs = [asyncio.ensure_future(download_one(url)) for url in urls]
+        if not jobs:
+            return []
+        
+        if stop_on_error:
+            _, pending = await asyncio.wait(jobs, return_when=asyncio.FIRST_EXCEPTION)
+            if pending:
+                self.logger.error("Stopping batch download due to error")
+                for job in pending:
+                    job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        
+        results = []
+        successful = 0
+        failed = 0
+        
+        for url, job in zip(urls, jobs):
+            if job.cancelled():
+                continue
+            error = job.exception()
+            if error is None:
+                result = job.result()
+            elif isinstance(error, DownloadError):
+                self.logger.warning(f"Batch download error for {url}: {error}")
+                result = {
+                    'success': False,
+                    'url': url,
+                    'error': str(error)
+                }
+            else:
+                raise error
+            
+            results.append(result)
+            if result.get('success'):
+                successful += 1
+            else:
+                failed += 1
+        
+        self.logger.info(f"Batch download completed. {successful} successful, {failed} failed")
         return results
     
     def get_video_info(self, url: str) -> Dict[str, Any]:
@@ -342,10 +536,15 @@ class AudioDownloader:
         Returns:
             Video information dictionary
         """
-        if not URLValidator.is_valid_youtube_url(url):
+        video_id, normalized_url = parse_youtube_url(url)
+        if video_id is None:
             raise DownloadError(f"Invalid YouTube URL: {url}")
         
-        normalized_url = URLValidator.normalize_url(url)
+        cached = self._get_cached_info(video_id)
+        if cached is not None:
+            return cached
+        
+        import yt_dlp
         
         try:
             ydl_opts = {'quiet': True}
@@ -353,7 +552,7 @@ class AudioDownloader:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(normalized_url, download=False)
                 
-                return {
+                video_info = {
                     'title': info.get('title'),
                     'duration': info.get('duration'),
                     'uploader': info.get('uploader'),
@@ -368,17 +567,42 @@ class AudioDownloader:
                 
         except Exception as e:
             raise DownloadError(f"Error extracting video info: {str(e)}") from e
+        
+        self._cache_info(video_id, video_info)
+        return dict(video_info)
+    
+    def _get_cached_info(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached video info if present and not expired."""
+        with self._info_cache_lock:
+            entry = self._info_cache.get(video_id)
+            if entry is None:
+                return None
+            expires_at, video_info = entry
+            if expires_at < time.monotonic():
+                del self._info_cache[video_id]
+                return None
+            self._info_cache.move_to_end(video_id)
+            return dict(video_info)
+    
+    def _cache_info(self, video_id: str, video_info: Dict[str, Any]) -> None:
+        """Store video info, evicting the least recently used entry when full."""
+        with self._info_cache_lock:
+            self._info_cache[video_id] = (time.monotonic() + self.INFO_CACHE_TTL, video_info)
+            self._info_cache.move_to_end(video_id)
+            if len(self._info_cache) > self.INFO_CACHE_SIZE:
+                self._info_cache.popitem(last=False)
     
     def _get_ydl_options(self, output_filename: Optional[str] = None) -> Dict[str, Any]:
         """Get YT-DLP options with custom filename if provided."""
-        ydl_opts = self.config.get_ydl_opts().copy()
+        ydl_opts = self.config.get_ydl_opts()
         
         if output_filename:
             # Use custom filename
             output_path = self.config.paths.downloads_dir / f"{output_filename}.%(ext)s"
-            ydl_opts['outtmpl'] = str(output_path)
+            return dict(ydl_opts, outtmpl=str(output_path))
         
-        return ydl_opts
+        # Copy the shared cached options so per-download keys stay local
+        return dict(ydl_opts)
     
     def _get_output_filename(self, info: Dict[str, Any], custom_filename: Optional[str] = None) -> str:
         """Get the expected output filename."""
@@ -388,7 +612,7 @@ class AudioDownloader:
         # Clean title for filename
         title = info.get('title', 'Unknown')
         # Remove invalid filename characters
-        cleaned_title = re.sub(r'[<>:"/\\|?*]', '_', title)
+        cleaned_title = title.translate(_FILENAME_TRANS)
         return f"{cleaned_title}.mp3"
 
 
@@ -7,13 +7,50 @@ and validation logic for the YouTube Audio Downloader project.
 
 import os
 import json
+import stat
+import functools
+import itertools
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field, fields
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
-class AudioConfig:
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Config files with this suffix are stored as MessagePack instead of JSON
+MSGPACK_SUFFIX = ".msgpack"
+
+# Changes with every assignment to a Config or section attribute; Config
+# caches remember the value they were built at and rebuild when it moves on
+_settings_changes = itertools.count()
+_settings_generation = next(_settings_changes)
+
+
+def _settings_changed() -> None:
+    """Move _settings_generation on, so every cached Config value is rebuilt."""
+    global _settings_generation
+    _settings_generation = next(_settings_changes)
+
+
+class _Section:
+    """Base for configuration sections: attribute changes invalidate Config caches."""
+    
+    __slots__ = ()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        _settings_changed()
+
+
+@dataclass(slots=True)
+class AudioConfig(_Section):
     """Configuration for audio download and conversion settings."""
     
     # Audio quality settings
@@ -38,18 +75,26 @@ class AudioConfig:
         }
 
 
-@dataclass
-class PathConfig:
+@dataclass(slots=True)
+class PathConfig(_Section):
     """Configuration for file paths and directories."""
     
     # Base project directory
     base_dir: Path = field(default_factory=lambda: Path.cwd())
     
+    # Create the output directories on init; disable to only read config
+    create: bool = True
+    
     # Output directories
     downloads_dir: Path = field(init=False)
     metadata_dir: Path = field(init=False)
     logs_dir: Path = field(init=False)
     
+    # os.stat results from _ensure_directories (None for directories it created)
+    _dir_stats: Dict[Path, Optional[os.stat_result]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    
     def __post_init__(self):
         """Initialize directory paths after dataclass creation."""
         self.downloads_dir = self.base_dir / "downloads"
@@ -57,12 +102,47 @@ class PathConfig:
         self.logs_dir = self.base_dir / "logs"
         
         # Create directories if they don't exist
-        self._ensure_directories()
+        if self.create:
+            self._ensure_directories()
     
     def _ensure_directories(self):
-        """Ensure all required directories exist."""
+        """Ensure all required directories exist, remembering what was found."""
         for directory in [self.downloads_dir, self.metadata_dir, self.logs_dir]:
-            directory.mkdir(exist_ok=True)
+            try:
+                st = os.stat(directory)
+            except FileNotFoundError:
+                directory.mkdir(exist_ok=True)
+                self._dir_stats[directory] = None
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                raise FileExistsError(f"Not a directory: {directory}")
+            self._dir_stats[directory] = st
+    
+    def directory_error(self, directory: Path) -> Optional[str]:
+        """
+        Check that a directory exists and is writable.
+        
+        Args:
+            directory: Directory to check
+            
+        Returns:
+            Error message, or None if the directory is usable
+        """
+        if directory in self._dir_stats:
+            if self._dir_stats[directory] is None:
+                # Created by _ensure_directories, so it exists and is ours
+                return None
+        else:
+            try:
+                st = os.stat(directory)
+            except FileNotFoundError:
+                return f"Directory does not exist: {directory}"
+            if not stat.S_ISDIR(st.st_mode):
+                return f"Directory does not exist: {directory}"
+        
+        if not os.access(directory, os.W_OK):
+            return f"No write permission for directory: {directory}"
+        return None
     
     def to_dict(self) -> Dict[str, str]:
         """Convert PathConfig to dictionary with string paths."""
@@ -74,8 +154,8 @@ class PathConfig:
         }
 
 
-@dataclass
-class YtDlpConfig:
+@dataclass(slots=True)
+class YtDlpConfig(_Section):
     """Configuration for YT-DLP specific options."""
     
     # Output filename template
@@ -130,8 +210,8 @@ class YtDlpConfig:
         }
 
 
-@dataclass
-class LoggingConfig:
+@dataclass(slots=True)
+class LoggingConfig(_Section):
     """Configuration for logging settings."""
     
     # Log levels
@@ -160,9 +240,29 @@ class LoggingConfig:
         }
 
 
+# Settings accepted from configuration files, with their expected types,
+# derived from the dataclass fields
+_FILE_SCHEMA = {
+    'audio': {f.name: f.type for f in fields(AudioConfig)},
+    'logging': {f.name: f.type for f in fields(LoggingConfig)},
+}
+
+
 class Config:
     """Main configuration class that combines all configuration sections."""
     
+    # Validation constants
+    _SUPPORTED_FORMATS = frozenset({'mp3', 'wav', 'aac', 'm4a', 'ogg'})
+    _VALID_LEVELS = frozenset({'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'})
+    _QUALITY_RANGE = (64, 320)
+    
+    _STR_TEMPLATE = (
+        "\nConfiguration:\n"
+        "  Audio: {fmt} @ {q}kbps\n"
+        "  Paths: {dl}\n"
+        "  Logging: {cl} (console), {fl} (file)\n"
+    )
+    
     def __init__(self, config_file: Optional[Path] = None):
         """
         Initialize configuration.
@@ -174,14 +274,39 @@ class Config:
         self.paths = PathConfig()
         self.ytdlp = YtDlpConfig()
         self.logging = LoggingConfig()
+        # (settings generation, value) pairs; see _settings_generation
+        self._ydl_opts_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._str_cache: Optional[Tuple[int, str]] = None
         
         # Load configuration from file if provided
         if config_file and config_file.exists():
             self.load_from_file(config_file)
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Replacing a section (e.g. config.paths = ...) must refresh the caches;
+        # storing the caches themselves must not
+        super().__setattr__(name, value)
+        if not name.startswith('_'):
+            _settings_changed()
+    
     def get_ydl_opts(self) -> Dict[str, Any]:
-        """Get complete YT-DLP options with paths configured."""
-        return self.ytdlp.get_ydl_opts(self.paths.downloads_dir)
+        """
+        Get complete YT-DLP options with paths configured.
+        
+        The dictionary is shared until a setting is assigned; copy it before
+        modifying. In-place changes to mutable values (e.g. appending to
+        ytdlp.postprocessors) need an explicit invalidate_ydl_opts().
+        """
+        cache = self._ydl_opts_cache
+        if cache is None or cache[0] != _settings_generation:
+            generation = _settings_generation
+            cache = (generation, self.ytdlp.get_ydl_opts(self.paths.downloads_dir))
+            self._ydl_opts_cache = cache
+        return cache[1]
+    
+    def invalidate_ydl_opts(self) -> None:
+        """Drop the cached YT-DLP options so the next call rebuilds them."""
+        self._ydl_opts_cache = None
     
     def save_to_file(self, config_file: Path):
         """
@@ -196,8 +321,15 @@ class Config:
             "logging": self.logging.to_dict()
         }
         
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=2, ensure_ascii=False)
+        if Path(config_file).suffix == MSGPACK_SUFFIX:
+            if msgpack is None:
+                raise ValueError("msgpack is required to save .msgpack configuration files")
+            Path(config_file).write_bytes(msgpack.packb(config_data, use_bin_type=True))
+        elif orjson is not None:
+            Path(config_file).write_bytes(orjson.dumps(config_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(config_data, f, indent=2, ensure_ascii=False)
     
     def load_from_file(self, config_file: Path):
         """
@@ -207,24 +339,57 @@ class Config:
             config_file: Path to configuration file
         """
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            if Path(config_file).suffix == MSGPACK_SUFFIX:
+                if msgpack is None:
+                    raise ValueError("msgpack is required to load .msgpack configuration files")
+                config_data = msgpack.unpackb(Path(config_file).read_bytes(), raw=False)
+            elif orjson is not None:
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                config_data = orjson.loads(Path(config_file).read_bytes())
+            else:
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    config_data = json.load(f)
             
-            # Update audio config
-            if 'audio' in config_data:
-                for key, value in config_data['audio'].items():
-                    if hasattr(self.audio, key):
-                        setattr(self.audio, key, value)
+            if not isinstance(config_data, dict):
+                raise ValueError("top-level value must be an object")
             
-            # Update logging config
-            if 'logging' in config_data:
-                for key, value in config_data['logging'].items():
-                    if hasattr(self.logging, key):
-                        setattr(self.logging, key, value)
+            # Update audio and logging config, checking types as values are applied
+            self._apply_section('audio', self.audio, config_data.get('audio', {}))
+            self._apply_section('logging', self.logging, config_data.get('logging', {}))
                         
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+        # ValueError covers json.JSONDecodeError and msgpack's unpack errors
+        except (FileNotFoundError, ValueError) as e:
             print(f"Warning: Could not load configuration file: {e}")
     
+    @staticmethod
+    def _apply_section(name: str, section: Any, values: Any) -> None:
+        """
+        Apply one section of a loaded configuration file.
+        
+        Unknown keys are ignored and values of the wrong type are skipped with
+        a warning; integers are accepted for string settings such as quality.
+        
+        Args:
+            name: Section name in the file
+            section: Dataclass instance to update
+            values: Section contents from the file
+        """
+        if not isinstance(values, dict):
+            print(f"Warning: Ignoring '{name}' configuration section: expected an object")
+            return
+        
+        schema = _FILE_SCHEMA[name]
+        for key, value in values.items():
+            expected = schema.get(key)
+            if expected is None:
+                continue
+            if expected is str and type(value) is int:
+                value = str(value)
+            if not isinstance(value, expected) or (type(value) is bool and expected is not bool):
+                print(f"Warning: Ignoring {name}.{key} in configuration file: expected {expected.__name__}")
+                continue
+            setattr(section, key, value)
+    
     def validate(self) -> bool:
         """
         Validate configuration settings.
@@ -234,37 +399,35 @@ class Config:
         """
         try:
             # Validate audio quality
-            if not self.audio.quality.isdigit():
+            try:
+                quality_int = int(self.audio.quality)
+            except (TypeError, ValueError):
                 print("Error: Audio quality must be a number")
                 return False
             
-            quality_int = int(self.audio.quality)
-            if quality_int < 64 or quality_int > 320:
-                print("Error: Audio quality must be between 64 and 320 kbps")
+            min_quality, max_quality = self._QUALITY_RANGE
+            if not min_quality <= quality_int <= max_quality:
+                print(f"Error: Audio quality must be between {min_quality} and {max_quality} kbps")
                 return False
             
             # Validate audio format
-            supported_formats = ['mp3', 'wav', 'aac', 'm4a', 'ogg']
-            if self.audio.format not in supported_formats:
-                print(f"Error: Unsupported audio format. Supported: {supported_formats}")
+            if self.audio.format not in self._SUPPORTED_FORMATS:
+                print(f"Error: Unsupported audio format. Supported: {sorted(self._SUPPORTED_FORMATS)}")
                 return False
             
             # Validate paths exist and are writable
             for directory in [self.paths.downloads_dir, self.paths.metadata_dir, self.paths.logs_dir]:
-                if not directory.exists():
-                    print(f"Error: Directory does not exist: {directory}")
-                    return False
-                if not os.access(directory, os.W_OK):
-                    print(f"Error: No write permission for directory: {directory}")
+                error = self.paths.directory_error(directory)
+                if error:
+                    print(f"Error: {error}")
                     return False
             
             # Validate logging level
-            valid_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
-            if self.logging.console_level not in valid_levels:
-                print(f"Error: Invalid console log level. Valid levels: {valid_levels}")
+            if self.logging.console_level not in self._VALID_LEVELS:
+                print(f"Error: Invalid console log level. Valid levels: {sorted(self._VALID_LEVELS)}")
                 return False
-            if self.logging.file_level not in valid_levels:
-                print(f"Error: Invalid file log level. Valid levels: {valid_levels}")
+            if self.logging.file_level not in self._VALID_LEVELS:
+                print(f"Error: Invalid file log level. Valid levels: {sorted(self._VALID_LEVELS)}")
                 return False
             
             return True
@@ -274,17 +437,32 @@ class Config:
             return False
     
     def __str__(self) -> str:
-        """String representation of the configuration."""
-        return f"""
-Configuration:
-  Audio: {self.audio.format} @ {self.audio.quality}kbps
-  Paths: {self.paths.downloads_dir}
-  Logging: {self.logging.console_level} (console), {self.logging.file_level} (file)
-"""
+        """String representation of the configuration, cached until a setting changes."""
+        cache = self._str_cache
+        if cache is None or cache[0] != _settings_generation:
+            generation = _settings_generation
+            cache = (generation, self._STR_TEMPLATE.format(
+                fmt=self.audio.format,
+                q=self.audio.quality,
+                dl=self.paths.downloads_dir,
+                cl=self.logging.console_level,
+                fl=self.logging.file_level
+            ))
+            self._str_cache = cache
+        return cache[1]
+
 
+@functools.cache
+def _default_config() -> Config:
+    """Build the default configuration instance on first use."""
+    return Config()
 
-# Default configuration instance
-default_config = Config()
+
+def __getattr__(name: str):
+    """Keep ``config.default_config`` working without creating it at import time."""
+    if name == "default_config":
+        return _default_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_config(config_file: Optional[Path] = None) -> Config:
@@ -299,12 +477,12 @@ def get_config(config_file: Optional[Path] = None) -> Config:
     """
     if config_file:
         return Config(config_file)
-    return default_config
+    return _default_config()
 
 
 def create_sample_config(output_file: Path):
     """
-    Create a sample configuration file.
+    Create a sample configuration file, plus a MessagePack copy if msgpack is installed.
     
     Args:
         output_file: Path where to create the sample configuration
@@ -312,6 +490,11 @@ def create_sample_config(output_file: Path):
     sample_config = Config()
     sample_config.save_to_file(output_file)
     print(f"Sample configuration created at: {output_file}")
+    
+    if msgpack is not None and output_file.suffix != MSGPACK_SUFFIX:
+        msgpack_file = output_file.with_suffix(MSGPACK_SUFFIX)
+        sample_config.save_to_file(msgpack_file)
+        print(f"Sample configuration created at: {msgpack_file}")
 
 
 if __name__ == "__main__":
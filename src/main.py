@@ -6,31 +6,100 @@ A command-line tool to download high-quality audio from YouTube videos
 and extract metadata using YT-DLP and FFmpeg.
 """
 
-import argparse
+import io
+import os
 import sys
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import List, Optional
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import argparse
 
 try:
     from .config import Config
-    from .audio_downloader import AudioDownloader, URLValidator
-    from .metadata_extractor import MetadataExtractor
 except ImportError:
     from config import Config
-    from audio_downloader import AudioDownloader, URLValidator
-    from metadata_extractor import MetadataExtractor
+
+
+EPILOG = """
+Examples:
+  %(prog)s download "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+  %(prog)s download --file urls.txt --metadata
+  %(prog)s info "https://youtu.be/dQw4w9WgXcQ"
+  %(prog)s config --show
+  
+For more information, visit: https://github.com/your-repo/yt-dlp-project
+            """
+
+# Top-level help as argparse renders it at 80 columns, so bare invocations and
+# --help can skip building the parser; keep in sync with create_parser()
+STATIC_HELP = """\
+usage: %(prog)s [-h] [-v] [-q] [-c CONFIG] {download,info,config} ...
+
+YouTube Audio Downloader - Download high-quality audio from YouTube videos
+
+positional arguments:
+  {download,info,config}
+                        Available commands
+    download            Download audio from YouTube
+    info                Extract video information
+    config              Configuration management
+
+options:
+  -h, --help            show this help message and exit
+  -v, --verbose         Enable verbose output
+  -q, --quiet           Enable quiet mode (errors only)
+""" + (
+    # argparse lists the metavar once per option from Python 3.13
+    "  -c, --config CONFIG   Path to configuration file\n"
+    if sys.version_info >= (3, 13) else
+    "  -c CONFIG, --config CONFIG\n"
+    "                        Path to configuration file\n"
+) + EPILOG + "\n"
+
+
+# The downloader and metadata modules pull in yt-dlp, which dominates start-up
+# time, so they are only imported by the commands that need them.
+def _import_audio_downloader():
+    """Import the audio_downloader module on demand."""
+    try:
+        from . import audio_downloader
+    except ImportError:
+        import audio_downloader
+    return audio_downloader
+
+
+def _import_metadata_extractor():
+    """Import the metadata_extractor module on demand."""
+    try:
+        from . import metadata_extractor
+    except ImportError:
+        import metadata_extractor
+    return metadata_extractor
 
 
 class YouTubeAudioDownloaderCLI:
     """Main CLI application class."""
     
+    # Progress line template and the minimum percentage change worth redrawing
+    PROGRESS_TEMPLATE = "\r🔄 Downloading: %.1f%% - %s"
+    PROGRESS_STEP = 0.5
+    
+    # Number of URLs from a file validated per batch
+    VALIDATE_CHUNK_SIZE = 1024
+    
     def __init__(self):
         """Initialize CLI application."""
         self.config = None
         self.downloader = None
         self.metadata_extractor = None
         self.logger = None
+        self._last_percentage = -1.0
+        self._stdout_lock = threading.Lock()
         
     def setup_logging(self, verbose: bool = False, quiet: bool = False):
         """Setup logging configuration based on CLI args."""
@@ -53,61 +122,96 @@ class YouTubeAudioDownloaderCLI:
         """Progress callback for downloads."""
         if info['status'] == 'downloading':
             percentage = info.get('percentage', 0)
-            speed = info.get('speed', 'Unknown')
-            print(f"\r🔄 Downloading: {percentage:.1f}% - {speed}", end='', flush=True)
+            # Skip redraws for tiny changes; a drop means a new file started
+            if 0 <= percentage - self._last_percentage < self.PROGRESS_STEP:
+                return
+            self._last_percentage = percentage
+            self._write(self.PROGRESS_TEMPLATE % (percentage, info.get('speed', 'Unknown')))
         elif info['status'] == 'finished':
-            print(f"\n✅ Download completed: {info['filename']}")
+            self._last_percentage = -1.0
+            self._write(f"\n✅ Download completed: {info['filename']}\n")
+    
+    def _write(self, text: str):
+        """Write text to stdout; the lock keeps parallel downloads from interleaving."""
+        with self._stdout_lock:
+            sys.stdout.write(text)
+            sys.stdout.flush()
     
     def download_command(self, args):
         """Handle download command."""
         print(f"🎵 YouTube Audio Downloader")
         print(f"📂 Output directory: {self.config.paths.downloads_dir}")
         
-        urls = []
-        
-        # Handle URL input
+        # Handle URL input; URL files are streamed rather than read up front
         if args.url:
-            urls.append(args.url)
+            lines = [args.url]
         elif args.file:
-            try:
-                with open(args.file, 'r', encoding='utf-8') as f:
-                    urls = [line.strip() for line in f if line.strip()]
-            except FileNotFoundError:
-                print(f"❌ File not found: {args.file}")
-                return 1
+            lines = self._read_url_file(args.file)
         else:
             print("❌ No URL provided. Use --url or --file option.")
             return 1
         
-        # Validate URLs
-        valid_urls = []
-        for url in urls:
-            if URLValidator.is_valid_youtube_url(url):
-                valid_urls.append(url)
-            else:
-                print(f"⚠️  Invalid YouTube URL (skipping): {url}")
+        valid_urls = self._iter_valid_urls(lines)
         
-        if not valid_urls:
-            print("❌ No valid YouTube URLs found.")
+        # Peek at up to two URLs to choose between single and batch mode
+        try:
+            first_urls = list(islice(valid_urls, 2))
+        except FileNotFoundError:
+            print(f"❌ File not found: {args.file}")
             return 1
         
-        print(f"📋 Processing {len(valid_urls)} video(s)...")
+        if not first_urls:
+            print("❌ No valid YouTube URLs found.")
+            return 1
         
         # Download videos
-        if len(valid_urls) == 1:
-            return self._download_single(valid_urls[0], args)
+        if len(first_urls) == 1:
+            print("📋 Processing 1 video(s)...")
+            return self._download_single(first_urls[0], args)
         else:
-            return self._download_batch(valid_urls, args)
+            print("📋 Processing videos...")
+            return self._download_batch(chain(first_urls, valid_urls), args)
+    
+    @staticmethod
+    def _read_url_file(path: Path) -> Iterator[str]:
+        """Yield lines from a URL file without loading it all into memory."""
+        with open(path, 'r', encoding='utf-8', buffering=1 << 16) as f:
+            yield from f
+    
+    @classmethod
+    def _iter_valid_urls(cls, lines: Iterable[str]) -> Iterator[str]:
+        """Yield unique valid YouTube URLs, warning about invalid ones."""
+        URLValidator = _import_audio_downloader().URLValidator
+        seen = set()
+        
+        def unique_urls() -> Iterator[str]:
+            for line in lines:
+                url = line.strip()
+                if url and url not in seen:
+                    seen.add(url)
+                    yield url
+        
+        # Validate in chunks so large files are still streamed
+        urls = unique_urls()
+        while chunk := list(islice(urls, cls.VALIDATE_CHUNK_SIZE)):
+            valid = set(URLValidator.filter_valid(chunk))
+            for url in chunk:
+                if url in valid:
+                    yield url
+                else:
+                    print(f"⚠️  Invalid YouTube URL (skipping): {url}")
     
     def _download_single(self, url: str, args) -> int:
         """Download a single video."""
         try:
             print(f"\n🔗 URL: {url}")
+            info = None
             
             # Extract metadata if requested
             if args.metadata or args.info_only:
                 print("📄 Extracting metadata...")
-                metadata = self.metadata_extractor.extract_metadata(url)
+                info = self.metadata_extractor.extract_info(url)
+                metadata = self.metadata_extractor.build_metadata(info)
                 
                 # Display basic info
                 video_info = metadata.get('video_info', {})
@@ -126,7 +230,8 @@ class YouTubeAudioDownloaderCLI:
             # Download audio (unless info-only)
             if not args.info_only:
                 print("🎵 Downloading audio...")
-                result = self.downloader.download_audio(url, args.output)
+                # Reuse the metadata fetch, if any, instead of requesting the page again
+                result = self.downloader.download_audio(url, args.output, info=info)
                 
                 if result['success']:
                     print(f"✅ Successfully downloaded: {result['filename']}")
@@ -139,55 +244,144 @@ class YouTubeAudioDownloaderCLI:
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
-            self.logger.error(f"Download error: {e}")
+            self.logger.error("Download error: %s", e)
             return 1
     
-    def _download_batch(self, urls: List[str], args) -> int:
+    def _download_batch(self, urls: Iterable[str], args) -> int:
         """Download multiple videos."""
+        jobs = getattr(args, 'jobs', 1) or 1
+        if jobs > 1:
+            return self._download_batch_parallel(urls, args, jobs)
+        
         successful = 0
         failed = 0
         
+        # Status lines are buffered and written in one go; the buffer is flushed
+        # before each download so they stay ordered with the progress line
+        buf = io.StringIO()
+        
+        def flush():
+            self._write(buf.getvalue())
+            buf.seek(0)
+            buf.truncate(0)
+        
         for i, url in enumerate(urls, 1):
-            print(f"\n📹 Processing video {i}/{len(urls)}")
-            print(f"🔗 URL: {url}")
+            buf.write(f"\n📹 Processing video {i}\n")
+            buf.write(f"🔗 URL: {url}\n")
             
             try:
-                # Extract metadata if requested
-                if args.metadata:
-                    metadata = self.metadata_extractor.extract_metadata(url)
-                    metadata_file = self.metadata_extractor.save_metadata(metadata)
-                    video_title = metadata.get('video_info', {}).get('title', 'Unknown')
-                    print(f"📄 Metadata: {video_title}")
-                
-                # Download audio
-                if not args.info_only:
-                    result = self.downloader.download_audio(url)
-                    if result['success']:
-                        print(f"✅ Downloaded: {result['filename']}")
-                        successful += 1
-                    else:
-                        print(f"❌ Failed: {result.get('error', 'Unknown error')}")
-                        failed += 1
-                else:
+                if self._process_one(url, args, buf, flush):
                     successful += 1
+                else:
+                    failed += 1
                         
             except Exception as e:
-                print(f"❌ Error: {str(e)}")
+                buf.write(f"❌ Error: {str(e)}\n")
                 failed += 1
                 
                 if not args.continue_on_error:
-                    print("💥 Stopping batch download due to error.")
+                    buf.write("💥 Stopping batch download due to error.\n")
                     break
+            finally:
+                flush()
+        
+        self._write(self._batch_summary(successful, failed))
+        return 0 if failed == 0 else 1
+    
+    def _download_batch_parallel(self, urls: Iterable[str], args, jobs: int) -> int:
+        """Download multiple videos with up to `jobs` downloads in flight."""
+        successful = 0
+        failed = 0
+        stopping = False
         
-        # Summary
-        print(f"\n📊 Batch completed:")
-        print(f"✅ Successful: {successful}")
-        print(f"❌ Failed: {failed}")
+        def work(i: int, url: str) -> Tuple[bool, str, Optional[Exception]]:
+            # Each video's status lines are written as one block once it is done
+            buf = io.StringIO()
+            buf.write(f"\n📹 Processing video {i}\n")
+            buf.write(f"🔗 URL: {url}\n")
+            try:
+                return self._process_one(url, args, buf), buf.getvalue(), None
+            except Exception as e:
+                buf.write(f"❌ Error: {str(e)}\n")
+                return False, buf.getvalue(), e
+        
+        # At most `jobs` URLs are submitted at a time, so URL files are still
+        # streamed and nothing waits in the executor queue: a worker freed by
+        # a failed download cannot start another before the error is seen
+        numbered = enumerate(urls, 1)
+        pending = set()
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="download") as executor:
+            while True:
+                while not stopping and len(pending) < jobs:
+                    item = next(numbered, None)
+                    if item is None:
+                        break
+                    pending.add(executor.submit(work, *item))
+                
+                if not pending:
+                    break
+                
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    success, output, error = future.result()
+                    if success:
+                        successful += 1
+                    else:
+                        failed += 1
+                    
+                    if error is not None and not args.continue_on_error and not stopping:
+                        stopping = True
+                        output += "💥 Stopping batch download due to error.\n"
+                    self._write(output)
+                
+                if stopping:
+                    # Drop anything not yet started; running downloads finish
+                    pending = {future for future in pending if not future.cancel()}
         
+        self._write(self._batch_summary(successful, failed))
         return 0 if failed == 0 else 1
     
+    def _process_one(self, url: str, args, buf: io.StringIO,
+                     before_download: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Process one batch URL, writing its status lines to `buf`.
+        
+        Returns whether the video succeeded; errors are left to the caller.
+        """
+        # Extract metadata if requested
+        info = None
+        if args.metadata:
+            info = self.metadata_extractor.extract_info(url)
+            metadata = self.metadata_extractor.build_metadata(info)
+            self.metadata_extractor.save_metadata(metadata)
+            video_title = metadata.get('video_info', {}).get('title', 'Unknown')
+            buf.write(f"📄 Metadata: {video_title}\n")
+        
+        if args.info_only:
+            return True
+        
+        # Download audio
+        if before_download is not None:
+            before_download()
+        result = self.downloader.download_audio(url, info=info)
+        if result['success']:
+            buf.write(f"✅ Downloaded: {result['filename']}\n")
+            return True
+        buf.write(f"❌ Failed: {result.get('error', 'Unknown error')}\n")
+        return False
+    
+    @staticmethod
+    def _batch_summary(successful: int, failed: int) -> str:
+        """Format the end-of-batch summary."""
+        return (
+            f"\n📊 Batch completed:\n"
+            f"✅ Successful: {successful}\n"
+            f"❌ Failed: {failed}\n"
+        )
+    
     def info_command(self, args):
         """Handle info command."""
+        URLValidator = _import_audio_downloader().URLValidator
         if not URLValidator.is_valid_youtube_url(args.url):
             print(f"❌ Invalid YouTube URL: {args.url}")
             return 1
@@ -246,20 +440,14 @@ class YouTubeAudioDownloaderCLI:
         
         return 0
     
-    def create_parser(self) -> argparse.ArgumentParser:
+    def create_parser(self) -> "argparse.ArgumentParser":
         """Create and configure argument parser."""
+        import argparse
+        
         parser = argparse.ArgumentParser(
             description="YouTube Audio Downloader - Download high-quality audio from YouTube videos",
             formatter_class=argparse.RawDescriptionHelpFormatter,
-            epilog="""
-Examples:
-  %(prog)s download "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
-  %(prog)s download --file urls.txt --metadata
-  %(prog)s info "https://youtu.be/dQw4w9WgXcQ"
-  %(prog)s config --show
-  
-For more information, visit: https://github.com/your-repo/yt-dlp-project
-            """)
+            epilog=EPILOG)
         
         # Global options
         parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
@@ -279,6 +467,8 @@ For more information, visit: https://github.com/your-repo/yt-dlp-project
         download_parser.add_argument('-m', '--metadata', action='store_true', help='Extract and save metadata')
         download_parser.add_argument('--info-only', action='store_true', help='Extract info only (no download)')
         download_parser.add_argument('--continue-on-error', action='store_true', help='Continue batch download on errors')
+        download_parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                                     help='Number of batch downloads to run in parallel (default: 1)')
         
         # Info command
         info_parser = subparsers.add_parser('info', help='Extract video information')
@@ -292,18 +482,22 @@ For more information, visit: https://github.com/your-repo/yt-dlp-project
         
         return parser
     
+    @staticmethod
+    def _print_static_help():
+        """Print the top-level help without building the argument parser."""
+        sys.stdout.write(STATIC_HELP % {'prog': os.path.basename(sys.argv[0])})
+    
     def run(self, argv: Optional[List[str]] = None) -> int:
         """Run the CLI application."""
-        parser = self.create_parser()
-        
         if not argv:
             argv = sys.argv[1:]
         
-        # Handle case with no arguments
-        if not argv:
-            parser.print_help()
+        # Handle case with no arguments or a bare --help without the parser
+        if not argv or argv[0] in ('-h', '--help'):
+            self._print_static_help()
             return 0
         
+        parser = self.create_parser()
         args = parser.parse_args(argv)
         
         # Setup logging
@@ -319,10 +513,14 @@ For more information, visit: https://github.com/your-repo/yt-dlp-project
             print(f"❌ Configuration error: {str(e)}")
             return 1
         
-        # Initialize components
+        # Initialize only the components the command uses
         try:
-            self.downloader = AudioDownloader(self.config, self.progress_callback)
-            self.metadata_extractor = MetadataExtractor(self.config)
+            if args.command == 'download' and not args.info_only:
+                AudioDownloader = _import_audio_downloader().AudioDownloader
+                self.downloader = AudioDownloader(self.config, self.progress_callback)
+            if args.command == 'info' or (args.command == 'download' and (args.metadata or args.info_only)):
+                MetadataExtractor = _import_metadata_extractor().MetadataExtractor
+                self.metadata_extractor = MetadataExtractor(self.config)
         except Exception as e:
             print(f"❌ Initialization error: {str(e)}")
             return 1
@@ -343,7 +541,7 @@ For more information, visit: https://github.com/your-repo/yt-dlp-project
             return 130
         except Exception as e:
             print(f"❌ Unexpected error: {str(e)}")
-            self.logger.error(f"Unexpected error: {e}")
+            self.logger.error("Unexpected error: %s", e)
             return 1
 
 
@@ -5,18 +5,44 @@ This module handles extraction and storage of metadata from YouTube videos,
 including video information, technical audio details, and custom formatting.
 """
 
+import os
+import re
+import mmap
 import json
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import yt_dlp
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple
 try:
     from .config import Config
-    from .audio_downloader import URLValidator
+    from .audio_downloader import _FILENAME_TRANS, URLValidator, parse_youtube_url
 except ImportError:
     from config import Config
-    from audio_downloader import URLValidator
+    from audio_downloader import _FILENAME_TRANS, URLValidator, parse_youtube_url
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# yt-dlp is imported on first use, as in audio_downloader
+if TYPE_CHECKING:
+    import yt_dlp
+
+# Configured loggers, keyed by the resolved log file they write to
+_file_loggers: Dict[Path, logging.Logger] = {}
+_file_loggers_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """Keep ``metadata_extractor.yt_dlp`` working without importing yt-dlp at import time."""
+    if name == "yt_dlp":
+        import yt_dlp
+        return yt_dlp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class MetadataError(Exception):
@@ -24,6 +50,33 @@ class MetadataError(Exception):
     pass
 
 
+def _write_file(path: Path, data: bytes) -> None:
+    """Write bytes to a file with raw os.write calls, bypassing Python's buffered I/O."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+# A template value that is exactly one %(field)s placeholder
+_FIELD_RE = re.compile(r'%\((\w+)\)s')
+
+
+class _InfoFields:
+    """Mapping view of an info dict for %-formatting, with None for missing fields."""
+    
+    __slots__ = ('info',)
+    
+    def __init__(self, info: Dict[str, Any]):
+        self.info = info
+    
+    def __getitem__(self, key: str) -> Any:
+        return self.info.get(key)
+
+
 class MetadataTemplate:
     """Template system for metadata formatting."""
     
@@ -59,45 +112,138 @@ class MetadataTemplate:
         }
     }
     
+    # Kinds of compiled template entries
+    FIELD, FORMAT, NOW_ISO, NOW_DATE, LITERAL = range(5)
+    
     @classmethod
-    def apply_template(cls, template: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+    def compile_template(cls, template: Dict[str, Any]) -> Tuple[Tuple[str, Tuple[Tuple[str, int, Any], ...]], ...]:
         """
-        Apply template to video information.
+        Compile a template into (section, ((key, kind, payload), ...)) entries.
         
         Args:
             template: Template dictionary
-            info: Video information from yt-dlp
             
         Returns:
-            Formatted metadata dictionary
+            Compiled template for apply_template()
         """
-        result = {}
+        spec = []
         
         for section, fields in template.items():
-            result[section] = {}
+            entries = []
             
             for key, template_value in fields.items():
                 if template_value is None:
                     # Handle special automatic fields
                     if key == "extracted_at":
-                        result[section][key] = datetime.now().isoformat()
+                        entries.append((key, cls.NOW_ISO, None))
                     elif key == "download_date":
-                        result[section][key] = datetime.now().strftime("%Y-%m-%d")
+                        entries.append((key, cls.NOW_DATE, None))
+                    else:
+                        entries.append((key, cls.LITERAL, None))
+                elif isinstance(template_value, str) and "%(" in template_value:
+                    match = _FIELD_RE.fullmatch(template_value)
+                    if match:
+                        # A lone field keeps the raw value from info
+                        entries.append((key, cls.FIELD, match.group(1)))
                     else:
-                        result[section][key] = None
-                elif isinstance(template_value, str) and template_value.startswith("%(") and template_value.endswith(")s"):
-                    # Extract field name from template
-                    field_name = template_value[2:-2]
-                    result[section][key] = info.get(field_name)
+                        # Anything else is %-formatted against info
+                        entries.append((key, cls.FORMAT, template_value))
+                else:
+                    entries.append((key, cls.LITERAL, template_value))
+            
+            spec.append((section, tuple(entries)))
+        
+        return tuple(spec)
+    
+    @classmethod
+    def apply_template(cls, template: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply template to video information.
+        
+        Values that are a single %(field)s take the raw value from info; other
+        strings containing placeholders are %-formatted against it. The default
+        template is compiled once; other templates are compiled on each call.
+        
+        Args:
+            template: Template dictionary
+            info: Video information from yt-dlp
+            
+        Returns:
+            Formatted metadata dictionary
+        """
+        if template is cls.DEFAULT_TEMPLATE:
+            spec = _DEFAULT_TEMPLATE_SPEC
+        else:
+            spec = cls.compile_template(template)
+        
+        now = datetime.now()
+        fields = _InfoFields(info)
+        field, fmt, now_iso, now_date = cls.FIELD, cls.FORMAT, cls.NOW_ISO, cls.NOW_DATE
+        result = {}
+        
+        for section, entries in spec:
+            values = result[section] = {}
+            
+            for key, kind, payload in entries:
+                if kind == field:
+                    values[key] = info.get(payload)
+                elif kind == fmt:
+                    try:
+                        values[key] = payload % fields
+                    except (TypeError, ValueError):
+                        # Keep malformed or mistyped format strings as literals
+                        values[key] = payload
+                elif kind == now_iso:
+                    values[key] = now.isoformat()
+                elif kind == now_date:
+                    # Same as strftime("%Y-%m-%d"), several times faster
+                    values[key] = now.date().isoformat()
                 else:
-                    result[section][key] = template_value
+                    values[key] = payload
         
         return result
 
 
+_DEFAULT_TEMPLATE_SPEC = MetadataTemplate.compile_template(MetadataTemplate.DEFAULT_TEMPLATE)
+
+
 class MetadataExtractor:
     """Main metadata extraction class."""
     
+    __slots__ = ('config', 'logger')
+    
+    # Seconds a cached yt-dlp info file stays valid; stream URLs inside the
+    # info expire after a few hours, so keep this well below that
+    INFO_CACHE_TTL = 3600
+    
+    # Most cached info files kept; the oldest are pruned on write past this
+    INFO_CACHE_MAX_FILES = 256
+    
+    # Units for _format_filesize, each 1024 times the previous
+    FILESIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+    
+    # Bytes per second of audio at 320 kbps (40 KB/s), for size estimates
+    MP3_BYTES_PER_SECOND = 40 * 1024
+    
+    # Metadata files at least this large are memory-mapped when loading
+    MMAP_THRESHOLD = 64 * 1024
+    
+    # yt-dlp options for metadata extraction
+    YDL_OPTS = {
+        'quiet': True,
+        'no_warnings': False,
+        'extract_flat': False,
+        'writeinfojson': False,
+        'writethumbnail': False,
+    }
+    
+    # Fast mode: skip the DASH/HLS manifests and translated subtitle lists,
+    # which only matter for format selection and technical details
+    YDL_FAST_OPTS = {
+        **YDL_OPTS,
+        'extractor_args': {'youtube': {'skip': ['dash', 'hls', 'translated_subs']}},
+    }
+    
     def __init__(self, config: Optional[Config] = None):
         """
         Initialize MetadataExtractor.
@@ -106,7 +252,6 @@ class MetadataExtractor:
             config: Configuration instance
         """
         self.config = config or Config()
-        self.logger = logging.getLogger(__name__)
         
         # Setup logging
         self._setup_logging()
@@ -116,14 +261,27 @@ class MetadataExtractor:
             raise ValueError("Invalid configuration provided")
     
     def _setup_logging(self) -> None:
-        """Setup logging configuration."""
-        log_file = self.config.paths.logs_dir / self.config.logging.log_filename
+        """Setup logging configuration (only once per log file)."""
+        log_file = (self.config.paths.logs_dir / self.config.logging.log_filename).resolve()
+        
+        with _file_loggers_lock:
+            logger = _file_loggers.get(log_file)
+            if logger is None:
+                logger = self._create_logger(log_file)
+                _file_loggers[log_file] = logger
+        self.logger = logger
+    
+    def _create_logger(self, log_file: Path) -> logging.Logger:
+        """Return a new child of the module logger that writes to log_file."""
+        # One child per log file: extractors sharing a file share its handlers,
+        # while ones with a different logs_dir never write to another's file
+        logger = logging.getLogger(__name__).getChild(str(len(_file_loggers)))
         
         # Configure logger
-        self.logger.setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG)
         
-        # File handler
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # File handler, not opened until the first write
+        file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
         file_handler.setLevel(getattr(logging, self.config.logging.file_level))
         
         # Console handler
@@ -139,74 +297,230 @@ class MetadataExtractor:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        # Add handlers if not already added (avoid duplicates)
-        handler_names = [type(h).__name__ for h in self.logger.handlers]
-        if 'FileHandler' not in handler_names:
-            self.logger.addHandler(file_handler)
-        if 'StreamHandler' not in handler_names:
-            self.logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        return logger
     
-    def extract_metadata(self, url: str, 
-                        template: Optional[Dict[str, Any]] = None,
-                        include_technical: bool = True) -> Dict[str, Any]:
+    def extract_info(self, url: str, use_cache: bool = True,
+                     ydl: Optional["yt_dlp.YoutubeDL"] = None,
+                     fast: bool = False) -> Dict[str, Any]:
         """
-        Extract metadata from YouTube video.
+        Fetch the raw yt-dlp information for a video without downloading it.
+        
+        Results are cached on disk per video ID for INFO_CACHE_TTL seconds.
+        Fast mode fetches less and skips yt-dlp's format processing; its
+        partial results are not cached, but a cached full result is used.
         
         Args:
             url: YouTube video URL
-            template: Optional custom metadata template
-            include_technical: Whether to include technical information
+            use_cache: Whether a cached result may be returned
+            ydl: Optional open YoutubeDL (built with YDL_OPTS, or
+                YDL_FAST_OPTS in fast mode) to reuse
+            fast: Whether to fetch only what basic metadata needs
             
         Returns:
-            Extracted metadata dictionary
+            Raw information dictionary from yt-dlp
             
         Raises:
             MetadataError: If extraction fails
         """
-        # Validate URL
-        if not URLValidator.is_valid_youtube_url(url):
+        # Validate and normalize URL
+        video_id, normalized_url = parse_youtube_url(url)
+        if normalized_url is None:
             raise MetadataError(f"Invalid YouTube URL: {url}")
         
-        # Normalize URL
-        normalized_url = URLValidator.normalize_url(url)
+        cache_file = self._cache_dir / f"{video_id}.json"
+        if use_cache:
+            info = self._read_cached_info(cache_file)
+            if info is not None:
+                self.logger.debug(f"Using cached metadata for: {normalized_url}")
+                return info
+        
         self.logger.info(f"Extracting metadata for: {normalized_url}")
+        import yt_dlp
         
         try:
-            # Configure yt-dlp for metadata extraction
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': False,
-                'extract_flat': False,
-                'writeinfojson': False,
-                'writethumbnail': False,
-            }
-            
             # Extract information
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(normalized_url, download=False)
+            if ydl is not None:
+                info = ydl.extract_info(normalized_url, download=False, process=not fast)
+            else:
+                with yt_dlp.YoutubeDL(dict(self.YDL_FAST_OPTS if fast else self.YDL_OPTS)) as ydl:
+                    info = ydl.extract_info(normalized_url, download=False, process=not fast)
             
-            # Use provided template or default
-            template_to_use = template or MetadataTemplate.DEFAULT_TEMPLATE
+        except yt_dlp.DownloadError as e:
+            error_msg = f"YT-DLP extraction error: {str(e)}"
+            self.logger.error(error_msg)
+            raise MetadataError(error_msg) from e
             
-            # Apply template
-            metadata = MetadataTemplate.apply_template(template_to_use, info)
+        except Exception as e:
+            error_msg = f"Unexpected error during metadata extraction: {str(e)}"
+            self.logger.error(error_msg)
+            raise MetadataError(error_msg) from e
+        
+        if not fast:
+            self._write_cached_info(cache_file, info)
+        return info
+    
+    @property
+    def _cache_dir(self) -> Path:
+        """Directory holding cached yt-dlp info files."""
+        return self.config.paths.metadata_dir / ".cache"
+    
+    def _read_cached_info(self, cache_file: Path) -> Optional[Dict[str, Any]]:
+        """Return the cached info in `cache_file`, or None if missing, stale or unreadable."""
+        try:
+            if time.time() - cache_file.stat().st_mtime >= self.INFO_CACHE_TTL:
+                cache_file.unlink(missing_ok=True)
+                return None
+            data = cache_file.read_bytes()
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_cached_info(self, cache_file: Path, info: Dict[str, Any]) -> None:
+        """Cache info for later calls; failures only cost a future fetch."""
+        import yt_dlp
+        
+        try:
+            # Same cleanup yt-dlp applies for --write-info-json, so the cached
+            # copy can still be handed back to yt-dlp for downloading
+            info = yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)
+            cache_file.parent.mkdir(exist_ok=True)
+            if orjson is not None:
+                data = orjson.dumps(info)
+            else:
+                data = json.dumps(info, ensure_ascii=False).encode('utf-8')
+            # Write a private temp file and swap it in, so readers and other
+            # writers never see a partially written cache file
+            tmp_file = cache_file.with_name(
+                f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            try:
+                _write_file(tmp_file, data)
+                os.replace(tmp_file, cache_file)
+            except OSError:
+                tmp_file.unlink(missing_ok=True)
+                raise
+            self._prune_cache()
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.debug(f"Could not cache metadata in {cache_file}: {e}")
+    
+    def _prune_cache(self) -> None:
+        """Delete expired cache files, then the oldest ones beyond INFO_CACHE_MAX_FILES."""
+        now = time.time()
+        entries = []
+        for cache_file in self._cache_dir.glob("*.json"):
+            try:
+                mtime = cache_file.stat().st_mtime
+                if now - mtime >= self.INFO_CACHE_TTL:
+                    cache_file.unlink()
+                else:
+                    entries.append((mtime, cache_file))
+            except FileNotFoundError:
+                pass
+        if len(entries) > self.INFO_CACHE_MAX_FILES:
+            entries.sort()
+            for _, cache_file in entries[:len(entries) - self.INFO_CACHE_MAX_FILES]:
+                cache_file.unlink(missing_ok=True)
+    
+    def clear_cache(self) -> int:
+        """
+        Delete all cached yt-dlp info files.
+        
+        Returns:
+            Number of files removed
+        """
+        removed = 0
+        try:
+            cache_files = list(self._cache_dir.glob("*.json"))
+        except OSError:
+            return 0
+        for cache_file in cache_files:
+            try:
+                cache_file.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        self.logger.info(f"Cleared {removed} cached metadata file(s)")
+        return removed
+    
+    def extract_metadata(self, url: str, 
+                        template: Optional[Dict[str, Any]] = None,
+                        include_technical: bool = True,
+                        ydl: Optional["yt_dlp.YoutubeDL"] = None,
+                        fast: bool = False) -> Dict[str, Any]:
+        """
+        Extract metadata from YouTube video.
+        
+        Args:
+            url: YouTube video URL
+            template: Optional custom metadata template
+            include_technical: Whether to include technical information
+            ydl: Optional open YoutubeDL (built with YDL_OPTS) to reuse
+            fast: Fetch less from YouTube and leave out technical information
+            
+        Returns:
+            Extracted metadata dictionary
             
-            # Add additional processing
-            metadata = self._post_process_metadata(metadata, info, include_technical)
+        Raises:
+            MetadataError: If extraction fails
+        """
+        info = self.extract_info(url, ydl=ydl, fast=fast)
+        
+        try:
+            metadata = self.build_metadata(info, template, include_technical and not fast)
             
             self.logger.info(f"Successfully extracted metadata for: {metadata.get('video_info', {}).get('title', 'Unknown')}")
             return metadata
             
-        except yt_dlp.DownloadError as e:
-            error_msg = f"YT-DLP extraction error: {str(e)}"
-            self.logger.error(error_msg)
-            raise MetadataError(error_msg) from e
-            
         except Exception as e:
             error_msg = f"Unexpected error during metadata extraction: {str(e)}"
             self.logger.error(error_msg)
             raise MetadataError(error_msg) from e
     
+    def refresh_metadata(self, url: str,
+                         template: Optional[Dict[str, Any]] = None,
+                         include_technical: bool = True) -> Dict[str, Any]:
+        """
+        Extract metadata from the network, replacing any cached information.
+        
+        Args:
+            url: YouTube video URL
+            template: Optional custom metadata template
+            include_technical: Whether to include technical information
+            
+        Returns:
+            Extracted metadata dictionary
+            
+        Raises:
+            MetadataError: If extraction fails
+        """
+        info = self.extract_info(url, use_cache=False)
+        return self.build_metadata(info, template, include_technical)
+    
+    def build_metadata(self, info: Dict[str, Any],
+                       template: Optional[Dict[str, Any]] = None,
+                       include_technical: bool = True) -> Dict[str, Any]:
+        """
+        Build metadata from an already extracted yt-dlp info dictionary.
+        
+        Args:
+            info: Raw information from yt-dlp
+            template: Optional custom metadata template
+            include_technical: Whether to include technical information
+            
+        Returns:
+            Metadata dictionary
+        """
+        # Use provided template or default
+        template_to_use = template or MetadataTemplate.DEFAULT_TEMPLATE
+        
+        # Apply template
+        metadata = MetadataTemplate.apply_template(template_to_use, info)
+        
+        # Add additional processing
+        return self._post_process_metadata(metadata, info, include_technical)
+    
     def _post_process_metadata(self, metadata: Dict[str, Any], 
                               raw_info: Dict[str, Any],
                               include_technical: bool) -> Dict[str, Any]:
@@ -221,32 +535,36 @@ class MetadataExtractor:
         Returns:
             Post-processed metadata
         """
-        # Format duration
-        if metadata.get("video_info", {}).get("duration"):
-            duration_seconds = metadata["video_info"]["duration"]
-            if isinstance(duration_seconds, (int, float)):
-                metadata["video_info"]["duration_formatted"] = self._format_duration(duration_seconds)
+        video_info = metadata.setdefault("video_info", {})
         
-        # Format file size
-        if include_technical and metadata.get("technical_info", {}).get("filesize"):
-            filesize = metadata["technical_info"]["filesize"]
-            if isinstance(filesize, (int, float)):
-                metadata["technical_info"]["filesize_formatted"] = self._format_filesize(filesize)
+        # Format duration
+        duration_seconds = video_info.get("duration")
+        if duration_seconds and isinstance(duration_seconds, (int, float)):
+            video_info["duration_formatted"] = self._format_duration(duration_seconds)
+        
+        # Format file size, or drop technical info when not wanted
+        if include_technical:
+            technical_info = metadata.get("technical_info")
+            filesize = technical_info.get("filesize") if technical_info else None
+            if filesize and isinstance(filesize, (int, float)):
+                technical_info["filesize_formatted"] = self._format_filesize(filesize)
+        else:
+            metadata.pop("technical_info", None)
         
         # Process tags (convert to list if string)
-        tags = metadata.get("video_info", {}).get("tags")
+        tags = video_info.get("tags")
         if isinstance(tags, str):
-            metadata["video_info"]["tags"] = tags.split(", ") if tags else []
+            tags = video_info["tags"] = tags.split(", ") if tags else []
         elif not isinstance(tags, list):
-            metadata["video_info"]["tags"] = []
+            tags = video_info["tags"] = []
         
         # Add computed fields
         metadata["computed"] = {
             "video_id": URLValidator.extract_video_id(raw_info.get('webpage_url', '')),
-            "has_description": bool(metadata.get("video_info", {}).get("description")),
-            "has_tags": len(metadata.get("video_info", {}).get("tags", [])) > 0,
+            "has_description": bool(video_info.get("description")),
+            "has_tags": len(tags) > 0,
             "estimated_file_size": self._estimate_mp3_size(raw_info.get('duration', 0)),
-            "duration_formatted": metadata.get("video_info", {}).get("duration_formatted"),
+            "duration_formatted": video_info.get("duration_formatted"),
             "metadata_version": "1.0"
         }
         
@@ -279,13 +597,22 @@ class MetadataExtractor:
             filename = f"{safe_title}_{video_id}.json"
             metadata_file = self.config.paths.metadata_dir / filename
         
-        # Ensure directory exists
-        metadata_file.parent.mkdir(parents=True, exist_ok=True)
-        
         try:
-            # Save metadata with pretty formatting
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False, default=str)
+            # Save metadata with pretty formatting, encoded up front so the
+            # file is written in one go
+            if orjson is not None:
+                data = orjson.dumps(
+                    metadata, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                )
+            else:
+                data = json.dumps(metadata, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+            
+            # The directory normally exists already, so only create it on demand
+            try:
+                _write_file(metadata_file, data)
+            except FileNotFoundError:
+                metadata_file.parent.mkdir(parents=True, exist_ok=True)
+                _write_file(metadata_file, data)
             
             self.logger.info(f"Metadata saved to: {metadata_file}")
             return metadata_file
@@ -306,8 +633,18 @@ class MetadataExtractor:
             Loaded metadata dictionary
         """
         try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            if orjson is not None:
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                with open(metadata_file, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size >= self.MMAP_THRESHOLD:
+                        # Parse large files straight from the page cache
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                            metadata = orjson.loads(view)
+                    else:
+                        metadata = orjson.loads(f.read())
+            else:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
             
             self.logger.info(f"Metadata loaded from: {metadata_file}")
             return metadata
@@ -321,7 +658,9 @@ class MetadataExtractor:
     
     def extract_and_save(self, url: str, 
                         output_file: Optional[Path] = None,
-                        template: Optional[Dict[str, Any]] = None) -> tuple[Dict[str, Any], Path]:
+                        template: Optional[Dict[str, Any]] = None,
+                        ydl: Optional["yt_dlp.YoutubeDL"] = None,
+                        fast: bool = False) -> tuple[Dict[str, Any], Path]:
         """
         Extract metadata and save to file in one operation.
         
@@ -329,85 +668,143 @@ class MetadataExtractor:
             url: YouTube video URL
             output_file: Optional output file path
             template: Optional metadata template
+            ydl: Optional open YoutubeDL (built with YDL_OPTS) to reuse
+            fast: Fetch less from YouTube and leave out technical information
             
         Returns:
             Tuple of (metadata, file_path)
         """
-        metadata = self.extract_metadata(url, template)
+        metadata = self.extract_metadata(url, template, ydl=ydl, fast=fast)
         file_path = self.save_metadata(metadata, output_file)
         return metadata, file_path
     
     def batch_extract(self, urls: List[str], 
-                     stop_on_error: bool = False) -> List[Dict[str, Any]]:
+                     stop_on_error: bool = False,
+                     max_workers: int = 4,
+                     fast: bool = False) -> List[Dict[str, Any]]:
         """
         Extract metadata for multiple URLs.
         
+        Extraction is network-bound, so up to `max_workers` URLs are fetched
+        at once on a thread pool; results keep the order of `urls`. YoutubeDL
+        is not thread-safe, so each worker builds one and reuses it.
+        
         Args:
             urls: List of YouTube URLs
             stop_on_error: Whether to stop on first error
+            max_workers: Maximum number of simultaneous extractions
+            fast: Fetch less from YouTube and leave out technical information
             
         Returns:
             List of results (metadata or error info)
         """
-        results = []
+        total = len(urls)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        successful = failed = 0
+        local = threading.local()
+        instances = []
+        instances_lock = threading.Lock()
+        
+        import yt_dlp
+        
+        # Bound once; the worker and result loops run per URL
+        logger = self.logger
+        extract_entry = self._extract_entry
+        ydl_opts = self.YDL_FAST_OPTS if fast else self.YDL_OPTS
+        
+        def extract(url: str, i: int) -> Dict[str, Any]:
+            ydl = getattr(local, 'ydl', None)
+            if ydl is None:
+                ydl = local.ydl = yt_dlp.YoutubeDL(dict(ydl_opts))
+                with instances_lock:
+                    instances.append(ydl)
+            return extract_entry(url, i, total, ydl, fast)
         
-        for i, url in enumerate(urls, 1):
-            self.logger.info(f"Processing metadata {i}/{len(urls)}: {url}")
-            
-            try:
-                metadata, file_path = self.extract_and_save(url)
-                
-                result = {
-                    'success': True,
-                    'url': url,
-                    'metadata': metadata,
-                    'file_path': str(file_path)
-                }
-                results.append(result)
-                
-            except MetadataError as e:
-                error_result = {
-                    'success': False,
-                    'url': url,
-                    'error': str(e)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(extract, url, i): i - 1
+                    for i, url in enumerate(urls, 1)
                 }
-                results.append(error_result)
-                
-                if stop_on_error:
-                    self.logger.error("Stopping batch extraction due to error")
-                    break
-                else:
-                    self.logger.warning(f"Continuing batch extraction after error: {e}")
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[futures[future]] = result
+                    
+                    if result['success']:
+                        successful += 1
+                    else:
+                        failed += 1
+                        if stop_on_error:
+                            logger.error("Stopping batch extraction due to error")
+                            # Cancels only extractions that have not started
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            break
+                        else:
+                            logger.warning(f"Continuing batch extraction after error: {result['error']}")
+            
+            # Leaving the pool waited for extractions that were still running
+            # when stop_on_error hit; keep the ones that finished
+            for future, index in futures.items():
+                if results[index] is None and not future.cancelled():
+                    result = future.result()
+                    results[index] = result
+                    if result['success']:
+                        successful += 1
+                    else:
+                        failed += 1
+        finally:
+            # The pool has joined its threads, so nothing is still using these
+            for ydl in instances:
+                ydl.close()
+        
+        # Extractions cancelled by stop_on_error leave gaps
+        results = [r for r in results if r is not None]
         
-        successful = len([r for r in results if r.get('success')])
-        failed = len([r for r in results if not r.get('success')])
-        self.logger.info(f"Batch metadata extraction completed. {successful} successful, {failed} failed")
+        logger.info(f"Batch metadata extraction completed. {successful} successful, {failed} failed")
         
         return results
     
+    def _extract_entry(self, url: str, i: int, total: int,
+                       ydl: Optional["yt_dlp.YoutubeDL"] = None,
+                       fast: bool = False) -> Dict[str, Any]:
+        """Extract and save metadata for one batch URL, returning its result entry."""
+        self.logger.info(f"Processing metadata {i}/{total}: {url}")
+        
+        try:
+            metadata, file_path = self.extract_and_save(url, ydl=ydl, fast=fast)
+            return {
+                'success': True,
+                'url': url,
+                'metadata': metadata,
+                'file_path': str(file_path)
+            }
+        except MetadataError as e:
+            return {
+                'success': False,
+                'url': url,
+                'error': str(e)
+            }
+    
     @staticmethod
     def _format_duration(seconds: float) -> str:
         """Format duration in seconds to HH:MM:SS."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)
+        hours, remainder = divmod(int(seconds), 3600)
+        minutes, secs = divmod(remainder, 60)
         
         if hours > 0:
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            return f"{hours:02d}:{minutes:02d}:{secs:02d}"
         else:
-            return f"{minutes:02d}:{seconds:02d}"
+            return f"{minutes:02d}:{secs:02d}"
     
     @staticmethod
     def _format_filesize(bytes_count: int) -> str:
         """Format file size in bytes to human readable format."""
         if not bytes_count:
             return "0 B"
-            
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if bytes_count < 1024.0:
-                return f"{bytes_count:.1f} {unit}"
-            bytes_count /= 1024.0
-        return f"{bytes_count:.1f} TB"
+        
+        # Pick the unit from the bit length instead of dividing in a loop
+        unit = max(0, min((int(bytes_count).bit_length() - 1) // 10, 4))
+        return f"{bytes_count / (1 << (unit * 10)):.1f} {MetadataExtractor.FILESIZE_UNITS[unit]}"
     
     @staticmethod
     def _estimate_mp3_size(duration_seconds: float) -> str:
@@ -415,18 +812,14 @@ class MetadataExtractor:
         if not duration_seconds:
             return "Unknown"
         
-        # 320 kbps = 40 KB/s
-        estimated_bytes = duration_seconds * 40 * 1024
+        estimated_bytes = duration_seconds * MetadataExtractor.MP3_BYTES_PER_SECOND
         return MetadataExtractor._format_filesize(int(estimated_bytes))
     
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
         """Sanitize filename for safe file system usage."""
-        import re
-        # Remove invalid characters
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-        # Limit length
-        return filename[:100] if len(filename) > 100 else filename
+        # Replace invalid characters and limit length
+        return filename.translate(_FILENAME_TRANS)[:100]
 
 
 # Utility functions for standalone usage
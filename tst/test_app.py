@@ -0,0 +1,160 @@
+"""
+Test file for api.app module.
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from api import app as app_module
+from api.app import CachedStaticFiles, precompress_static_assets
+
+
+def make_static_client(static_dir):
+    """Return a TestClient for an app serving static_dir through CachedStaticFiles."""
+    static_app = FastAPI()
+    static_app.mount("/static", CachedStaticFiles(directory=str(static_dir)), name="static")
+    return TestClient(static_app)
+
+
+def test_precompressed_sibling_follows_accept_encoding(monkeypatch, tmp_path):
+    """
+    Test that the best accepted precompressed sibling is served, and the original otherwise.
+    """
+    # Arrange
+    monkeypatch.setattr(app_module, "STATIC_CACHE", {})
+    css = b"body { color: red; }\n" * 50
+    (tmp_path / "style.css").write_bytes(css)
+    written = precompress_static_assets(tmp_path)
+    client = make_static_client(tmp_path)
+
+    # Act
+    gzipped = client.get("/static/style.css", headers={"Accept-Encoding": "gzip"})
+    brotli_first = client.get("/static/style.css", headers={"Accept-Encoding": "br, gzip"})
+    identity = client.get("/static/style.css", headers={"Accept-Encoding": "identity"})
+
+    # Assert
+    assert written == (2 if app_module.brotli is not None else 1)
+    assert (tmp_path / "style.css.gz").is_file()
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert gzipped.content == css
+    expected = "br" if app_module.brotli is not None else "gzip"
+    assert brotli_first.headers["content-encoding"] == expected
+    assert "content-encoding" not in identity.headers
+    assert identity.content == css
+    assert precompress_static_assets(tmp_path) == 0
+
+
+def test_cached_static_file_etag_revalidates(monkeypatch, tmp_path):
+    """
+    Test that an in-memory static file answers a matching If-None-Match with 304.
+    """
+    # Arrange
+    monkeypatch.setattr(app_module, "STATIC_CACHE", {})
+    script = b"console.log('hot');\n"
+    (tmp_path / "app.js").write_bytes(script)
+    app_module.cache_static_content("app.js", script, "text/javascript")
+    client = make_static_client(tmp_path)
+    headers = {"Accept-Encoding": "identity"}
+
+    # Act
+    first = client.get("/static/app.js", headers=headers)
+    etag = first.headers["etag"]
+    revalidated = client.get("/static/app.js", headers={**headers, "If-None-Match": etag})
+    stale = client.get("/static/app.js", headers={**headers, "If-None-Match": '"other"'})
+
+    # Assert
+    assert first.status_code == 200
+    assert first.content == script
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["cache-control"] == CachedStaticFiles.DEFAULT_CACHE_CONTROL
+    assert stale.status_code == 200
+
+
+def test_cache_control_depends_on_fingerprint(tmp_path):
+    """
+    Test that fingerprinted assets are immutable and other files are cached for an hour.
+    """
+    # Arrange
+    (tmp_path / "app.3f9a1c2b.js").write_bytes(b"var a = 1;\n")
+    (tmp_path / "app.js").write_bytes(b"var a = 1;\n")
+    client = make_static_client(tmp_path)
+
+    # Act
+    hashed = client.get("/static/app.3f9a1c2b.js")
+    plain = client.get("/static/app.js")
+    missing = client.get("/static/missing.js")
+
+    # Assert
+    assert hashed.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert plain.headers["cache-control"] == "public, max-age=3600"
+    assert missing.status_code == 404
+    assert "cache-control" not in missing.headers
+
+
+def test_index_is_served_from_raw_or_rendered_template(monkeypatch, tmp_path):
+    """
+    Test that an index without Jinja syntax is served byte-for-byte and one with it is rendered.
+    """
+    # Arrange
+    monkeypatch.setattr(app_module, "STATIC_CACHE", {})
+    monkeypatch.setattr(app_module, "static_dir", tmp_path / "static")
+    monkeypatch.setattr(app_module, "templates_dir", tmp_path)
+    monkeypatch.setattr(app_module, "templates", Jinja2Templates(directory=str(tmp_path)))
+    # Jinja drops a single trailing newline, so it shows which path was taken
+    raw_index = b"<html><body>Plain</body></html>\n"
+    index_file = tmp_path / "index.html"
+    client = TestClient(app_module.app)
+    headers = {"Accept-Encoding": "identity"}
+
+    # Act
+    index_file.write_bytes(raw_index)
+    app_module.load_static_cache()
+    raw = client.get("/", headers=headers)
+    index_file.write_bytes(b"<p>{{ 1 + 1 }}</p>\n")
+    app_module.load_static_cache()
+    rendered = client.get("/", headers=headers)
+
+    # Assert
+    assert raw.content == raw_index
+    assert raw.headers["cache-control"] == "no-cache"
+    assert raw.headers["content-type"] == "text/html; charset=utf-8"
+    assert rendered.content == b"<p>2</p>"
+
+
+def test_audio_and_sse_responses_are_not_gzipped(monkeypatch, tmp_path):
+    """
+    Test that GZipMiddleware leaves MP3 downloads and SSE streams alone but still compresses JSON.
+    """
+    # Arrange
+    from api import routes
+    from config import PathConfig
+    monkeypatch.setattr(routes.config, "paths", PathConfig(base_dir=tmp_path))
+    (routes.config.paths.downloads_dir / "song.mp3").write_bytes(b"\0" * 4096)
+    client = TestClient(app_module.app)
+    headers = {"Accept-Encoding": "gzip"}
+
+    # Act
+    audio = client.get("/api/downloads/song.mp3", headers=headers)
+    progress = client.get("/api/progress/missing", headers=headers)
+    schema = client.get("/openapi.json", headers=headers)
+
+    # Assert
+    assert audio.headers["content-type"] == "audio/mpeg"
+    assert "content-encoding" not in audio.headers
+    assert audio.content == b"\0" * 4096
+    assert progress.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in progress.headers
+    assert "Task not found" in progress.text
+    assert schema.headers["content-encoding"] == "gzip"
@@ -0,0 +1,261 @@
+"""
+Test file for audio_downloader module.
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from audio_downloader import AudioDownloader, DownloadError, ProgressTracker, URLValidator, parse_youtube_url
+
+
+def test_url_validator_patterns():
+    """
+    Test validation and video ID extraction for each supported URL form.
+    """
+    # Arrange
+    test_cases = [
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("youtube.com/embed/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("  https://m.youtube.com/watch?v=dQw4w9WgXcQ  ", "dQw4w9WgXcQ"),
+        ("https://vimeo.com/123456789", None),
+        ("invalid_url", None),
+        ("https://youtu.be/dQw4w9WgXcQ?t=é", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4wé9WgXcQ", None),
+    ]
+    
+    for url, expected_id in test_cases:
+        # Act
+        is_valid = URLValidator.is_valid_youtube_url(url)
+        video_id = URLValidator.extract_video_id(url)
+        
+        # Assert
+        assert is_valid is (expected_id is not None), f"Unexpected validation result for {url}"
+        assert video_id == expected_id, f"Expected {expected_id} for {url}, got {video_id}"
+    
+    assert URLValidator.is_valid_youtube_url("") is False
+    assert parse_youtube_url(" youtu.be/dQw4w9WgXcQ ") == ("dQw4w9WgXcQ", "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    assert parse_youtube_url(None) == (None, None)
+    assert URLValidator.normalize_url("https://youtu.be/dQw4w9WgXcQ") == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def test_video_info_cache_expires():
+    """
+    Test that cached video info is returned as a copy until its TTL passes.
+    """
+    # Arrange
+    downloader = AudioDownloader()
+    downloader._cache_info("dQw4w9WgXcQ", {'title': "Cached title"})
+    
+    # Act
+    first = downloader._get_cached_info("dQw4w9WgXcQ")
+    first['title'] = "Changed"
+    second = downloader._get_cached_info("dQw4w9WgXcQ")
+    downloader.INFO_CACHE_TTL = -1
+    downloader._cache_info("dQw4w9WgXcQ", {'title': "Stale title"})
+    expired = downloader._get_cached_info("dQw4w9WgXcQ")
+    
+    # Assert
+    assert second == {'title': "Cached title"}
+    assert expired is None
+    assert downloader._get_cached_info("unknown0000") is None
+
+
+def test_format_bytes():
+    """
+    Test the _format_bytes static method across unit boundaries.
+    """
+    # Arrange
+    test_cases = [
+        (0, "0 B"),
+        (0.5, "0.5 B"),  # yt-dlp reports speed as a float, which can be below 1 B/s
+        (1023, "1023.0 B"),
+        (1024, "1.0 KB"),
+        (1536, "1.5 KB"),
+        (1048576, "1.0 MB"),
+        (2.5 * 1024 ** 3, "2.5 GB"),
+        (3 * 1024 ** 4, "3.0 TB"),
+    ]
+    
+    for bytes_count, expected in test_cases:
+        # Act
+        result = ProgressTracker._format_bytes(bytes_count)
+        
+        # Assert
+        assert result == expected, f"Expected {expected} for {bytes_count} bytes, got {result}"
+
+
+def test_progress_tracker_throttles_ticks():
+    """
+    Test that rapid downloading ticks are coalesced but finished is always sent.
+    """
+    # Arrange
+    received = []
+    tracker = ProgressTracker(received.append)
+    tick = {'status': 'downloading', 'filename': 'a.webm', 'total_bytes': 100, 'downloaded_bytes': 50}
+    
+    # Act
+    for _ in range(20):
+        tracker.hook(tick)
+    tracker.hook({'status': 'finished', 'filename': 'a.webm'})
+    
+    # Assert
+    assert [info['status'] for info in received] == ['downloading', 'finished']
+
+
+def test_output_filename_replaces_invalid_characters():
+    """
+    Test that characters invalid in filenames are replaced with underscores.
+    """
+    # Arrange
+    downloader = AudioDownloader()
+    
+    # Act
+    result = downloader._get_output_filename({'title': 'AC/DC: "Live" <1991> | Back\\In?Black*'})
+    custom = downloader._get_output_filename({'title': 'Ignored'}, "custom")
+    
+    # Assert
+    assert result == 'AC_DC_ _Live_ _1991_ _ Back_In_Black_.mp3'
+    assert custom == 'custom.mp3'
+
+
+def test_downloaders_log_to_their_own_logs_dir(tmp_path):
+    """
+    Test that downloaders configured with different logs_dir values write to separate files.
+    """
+    # Arrange
+    from config import Config, PathConfig
+    downloaders = []
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        config = Config()
+        config.paths = PathConfig(base_dir=tmp_path / name)
+        downloaders.append(AudioDownloader(config))
+    first, second = downloaders
+    
+    # Act
+    first.logger.warning("from first")
+    second.logger.warning("from second")
+    for downloader in downloaders:
+        for handler in downloader.logger.handlers:
+            handler.flush()
+    
+    # Assert
+    first_log = (tmp_path / "a" / "logs" / "yt_downloader.log").read_text(encoding='utf-8')
+    second_log = (tmp_path / "b" / "logs" / "yt_downloader.log").read_text(encoding='utf-8')
+    assert "from first" in first_log and "from second" not in first_log
+    assert "from second" in second_log and "from first" not in second_log
+    assert AudioDownloader(first.config).logger is first.logger
+
+
+def test_download_batch_async_keeps_url_order(monkeypatch):
+    """
+    Test that concurrent batch downloads return results in URL order with errors inline.
+    """
+    # Arrange
+    downloader = AudioDownloader()
+    urls = [f"https://youtu.be/video{i:06d}" for i in range(5)]
+    
+    def fake_download(url):
+        time.sleep(0.01 * (5 - int(url[-1])))
+        if url.endswith("3"):
+            raise DownloadError("Download failed")
+        return {'success': True, 'url': url}
+    
+    monkeypatch.setattr(downloader, "download_audio", fake_download)
+    
+    # Act
+    results = asyncio.run(downloader.download_batch_async(urls, max_parallel=3))
+    
+    # Assert
+    assert [result['url'] for result in results] == urls
+    assert [result['success'] for result in results] == [True, True, True, False, True]
+
+
+def test_download_audio_reuses_given_info(monkeypatch):
+    """
+    Test that pre-extracted info is downloaded without fetching the page again.
+    """
+    # Arrange
+    import audio_downloader
+    calls = []
+    
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            pass
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+        
+        def extract_info(self, url, download=False):
+            calls.append("extract_info")
+            return {'title': "Fetched"}
+        
+        def process_ie_result(self, info, download=True):
+            calls.append("process_ie_result")
+            return info
+    
+    monkeypatch.setattr(audio_downloader.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    downloader = AudioDownloader()
+    
+    # Act
+    result = downloader.download_audio("https://youtu.be/dQw4w9WgXcQ", info={'title': "Known"})
+    with_info = downloader.download_audio("https://youtu.be/dQw4w9WgXcQ", info={'title': "Known"}, return_info=True)
+    
+    # Assert
+    assert calls == ["process_ie_result", "process_ie_result"]
+    assert result['title'] == "Known"
+    assert 'info' not in result
+    assert with_info['info'] == {'title': "Known"}
+
+
+def test_filter_valid_matches_single_url_checks():
+    """
+    Test that batch validation agrees with per-URL validation and keeps order.
+    """
+    # Arrange
+    urls = [
+        "https://youtu.be/dQw4w9WgXcQ",
+        "not a url",
+        "youtu.be/dQw4w9WgXcQé",
+        "foo\nhttps://youtu.be/dQw4w9WgXcQ",
+        "https://m.youtube.com/embed/aaaaaaaaaaa",
+        "https://youtu.be/short",
+    ]
+    
+    # Act
+    valid = URLValidator.filter_valid(urls)
+    
+    # Assert
+    assert valid == [url for url in urls if URLValidator.is_valid_youtube_url(url)]
+    assert valid == [urls[0], urls[2], urls[4]]
+
+
+def test_url_validator_calls_share_memoized_match():
+    """
+    Test that validating, normalizing and extracting the same URL reuse one cached match.
+    """
+    # Arrange
+    import audio_downloader
+    url = "https://youtu.be/bbbbbbbbbbb"
+    audio_downloader._match_youtube.cache_clear()
+    
+    # Act
+    URLValidator.is_valid_youtube_url(url)
+    URLValidator.normalize_url(url)
+    URLValidator.extract_video_id(url)
+    info = audio_downloader._match_youtube.cache_info()
+    
+    # Assert
+    assert info.misses == 1
+    assert info.hits == 2
@@ -0,0 +1,214 @@
+"""
+Test file for config module.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from config import Config, PathConfig
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """
+    Test that saved audio and logging settings are restored on load.
+    """
+    # Arrange
+    config_file = tmp_path / "config.json"
+    config = Config()
+    config.audio.quality = "192"
+    config.logging.console_level = "WARNING"
+    
+    # Act
+    config.save_to_file(config_file)
+    loaded = Config(config_file)
+    
+    # Assert
+    assert loaded.audio.quality == "192"
+    assert loaded.logging.console_level == "WARNING"
+    assert config_file.read_text(encoding='utf-8').startswith('{\n  "audio"')
+
+
+def test_load_invalid_file_keeps_defaults(tmp_path):
+    """
+    Test that an invalid JSON file is reported and leaves defaults in place.
+    """
+    # Arrange
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{not json", encoding='utf-8')
+    
+    # Act
+    loaded = Config(config_file)
+    
+    # Assert
+    assert loaded.audio.quality == "320"
+
+
+def test_msgpack_round_trip(tmp_path):
+    """
+    Test that .msgpack configuration files round-trip when msgpack is installed.
+    """
+    # Arrange
+    pytest.importorskip("msgpack")
+    config_file = tmp_path / "config.msgpack"
+    config = Config()
+    config.audio.format = "m4a"
+    
+    # Act
+    config.save_to_file(config_file)
+    loaded = Config(config_file)
+    
+    # Assert
+    assert loaded.audio.format == "m4a"
+
+
+def test_path_config_without_create(tmp_path):
+    """
+    Test that PathConfig(create=False) resolves paths without touching the filesystem.
+    """
+    # Act
+    paths = PathConfig(base_dir=tmp_path, create=False)
+    
+    # Assert
+    assert paths.downloads_dir == tmp_path / "downloads"
+    assert not paths.downloads_dir.exists()
+    assert "create" not in paths.to_dict()
+
+
+def test_validate_rejects_bad_settings():
+    """
+    Test that validation catches bad quality, format and log level values.
+    """
+    # Arrange
+    test_cases = [
+        ("quality", "abc"),
+        ("quality", "32"),
+        ("quality", "400"),
+        ("format", "flac"),
+        ("console_level", "VERBOSE"),
+    ]
+    
+    assert Config().validate() is True
+    
+    for attribute, value in test_cases:
+        config = Config()
+        section = config.logging if attribute == "console_level" else config.audio
+        setattr(section, attribute, value)
+        
+        # Act
+        result = config.validate()
+        
+        # Assert
+        assert result is False, f"Expected {attribute}={value!r} to be rejected"
+
+
+def test_load_checks_value_types(tmp_path):
+    """
+    Test that loaded values are type-checked, with integers accepted for string settings.
+    """
+    # Arrange
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        '{"audio": {"quality": 192, "extract_audio": "yes", "to_dict": 1},'
+        ' "logging": {"backup_count": true, "file_level": "INFO"}}',
+        encoding='utf-8'
+    )
+    
+    # Act
+    loaded = Config(config_file)
+    
+    # Assert
+    assert loaded.audio.quality == "192"
+    assert loaded.audio.extract_audio is True
+    assert loaded.logging.backup_count == 5
+    assert loaded.logging.file_level == "INFO"
+    assert loaded.validate() is True
+
+
+def test_directory_checks_reuse_startup_stats(tmp_path):
+    """
+    Test that created directories validate and missing ones are reported.
+    """
+    # Arrange
+    (tmp_path / "created").mkdir()
+    created = PathConfig(base_dir=tmp_path / "created")
+    unchecked = PathConfig(base_dir=tmp_path / "missing", create=False)
+    
+    # Act
+    created_error = created.directory_error(created.downloads_dir)
+    missing_error = unchecked.directory_error(unchecked.downloads_dir)
+    
+    # Assert
+    assert created_error is None
+    assert missing_error == f"Directory does not exist: {unchecked.downloads_dir}"
+
+
+def test_ydl_opts_are_cached_until_invalidated():
+    """
+    Test that YT-DLP options are reused until explicitly invalidated.
+    """
+    # Arrange
+    config = Config()
+    
+    # Act
+    first = config.get_ydl_opts()
+    second = config.get_ydl_opts()
+    config.ytdlp.retries = 7
+    config.invalidate_ydl_opts()
+    rebuilt = config.get_ydl_opts()
+    
+    # Assert
+    assert first is second
+    assert rebuilt is not first
+    assert rebuilt['retries'] == 7
+
+
+def test_caches_follow_direct_assignments(tmp_path):
+    """
+    Test that assigning settings directly refreshes the cached string and YT-DLP options.
+    """
+    # Arrange
+    config = Config()
+    first_opts = config.get_ydl_opts()
+    first_str = str(config)
+    
+    # Act
+    config.audio.quality = "128"
+    config.ytdlp.retries = 9
+    updated_str = str(config)
+    updated_opts = config.get_ydl_opts()
+    config.paths = PathConfig(base_dir=tmp_path)
+    moved_opts = config.get_ydl_opts()
+    
+    # Assert
+    assert "@ 320kbps" in first_str and "@ 128kbps" in updated_str
+    assert first_opts['retries'] == 3 and updated_opts['retries'] == 9
+    assert str(config).count(str(tmp_path)) == 1
+    assert moved_opts['outtmpl'].startswith(str(tmp_path))
+    assert config.get_ydl_opts() is moved_opts
+
+
+def test_str_is_refreshed_after_load(tmp_path):
+    """
+    Test that the cached string representation is rebuilt when a file is loaded.
+    """
+    # Arrange
+    config_file = tmp_path / "config.json"
+    config_file.write_text('{"audio": {"quality": "128"}}', encoding='utf-8')
+    config = Config()
+    before = str(config)
+    
+    # Act
+    config.load_from_file(config_file)
+    after = str(config)
+    
+    # Assert
+    assert before.startswith("\nConfiguration:\n  Audio: mp3 @ 320kbps\n")
+    assert "@ 128kbps" in after
+    assert str(config) is after
@@ -0,0 +1,203 @@
+"""
+Test file for api.database module.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from api.database import Database
+
+
+def test_shared_connection_round_trip(tmp_path):
+    """
+    Test add, read and delete through the shared connection.
+    """
+    async def scenario():
+        # Arrange
+        db = Database(tmp_path / "history.db")
+
+        try:
+            # Act
+            download_id = await db.add_download(
+                url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                title="Test title",
+                filename="Test title.mp3",
+                file_size=2048
+            )
+            entry = await db.get_download_by_id(download_id)
+            stats = await db.get_stats()
+            deleted = await db.delete_download(download_id)
+            missing = await db.get_download_by_id(download_id)
+        finally:
+            await db.close()
+
+        # Assert
+        assert entry["title"] == "Test title"
+        assert entry["file_size"] == 2048
+        assert stats["total_downloads"] == 1
+        assert stats["total_size_bytes"] == 2048
+        assert deleted is True
+        assert missing is None
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_inserts_get_matching_ids(tmp_path):
+    """
+    Test that batched inserts resolve each caller with its own row ID.
+    """
+    async def scenario():
+        # Arrange
+        db = Database(tmp_path / "history.db")
+        titles = [f"Video {i}" for i in range(10)]
+
+        try:
+            # Act
+            ids = await asyncio.gather(*(
+                db.add_download(url=f"https://youtu.be/{i:011d}", title=title, filename=f"{title}.mp3")
+                for i, title in enumerate(titles)
+            ))
+            entries = [await db.get_download_by_id(download_id) for download_id in ids]
+        finally:
+            await db.close()
+
+        # Assert
+        assert len(set(ids)) == len(titles)
+        assert [entry["title"] for entry in entries] == titles
+
+    asyncio.run(scenario())
+
+
+def test_history_keyset_pagination(tmp_path):
+    """
+    Test that before_id pages continue where the previous page stopped.
+    """
+    async def scenario():
+        # Arrange
+        db = Database(tmp_path / "history.db")
+
+        try:
+            for i in range(5):
+                await db.add_download(url=f"https://youtu.be/{i:011d}", title=f"Video {i}", filename=f"{i}.mp3")
+
+            # Act
+            first_page = await db.get_history(limit=2)
+            second_page = await db.get_history(limit=2, before_id=first_page[-1]["id"])
+            offset_page = await db.get_history(limit=2, offset=2)
+        finally:
+            await db.close()
+
+        # Assert
+        assert [entry["title"] for entry in first_page] == ["Video 4", "Video 3"]
+        assert second_page == offset_page
+        assert "url" not in second_page[0]
+
+    asyncio.run(scenario())
+
+
+def test_history_pagination_after_cursor_deleted(tmp_path):
+    """
+    Test that a before_id whose entry was deleted still returns the older entries.
+    """
+    async def scenario():
+        # Arrange
+        db = Database(tmp_path / "history.db")
+
+        try:
+            ids = [
+                await db.add_download(url=f"https://youtu.be/{i:011d}", title=f"Video {i}", filename=f"{i}.mp3")
+                for i in range(4)
+            ]
+            await db.delete_download(ids[2])
+
+            # Act
+            page = await db.get_history(limit=10, before_id=ids[2])
+            past_end = await db.get_history(limit=10, before_id=99999)
+        finally:
+            await db.close()
+
+        # Assert
+        assert [entry["title"] for entry in page] == ["Video 1", "Video 0"]
+        assert [entry["title"] for entry in past_end] == ["Video 3", "Video 1", "Video 0"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_keeps_writer_alive(tmp_path):
+    """
+    Test that a failing insert batch, even with a failing rollback, does not stop later inserts.
+    """
+    async def scenario():
+        # Arrange
+        db = Database(tmp_path / "history.db")
+        await db.initialize()
+        conn = db._conn
+        real_executemany = conn.executemany
+        real_rollback = conn.rollback
+
+        async def failing_executemany(*args, **kwargs):
+            raise RuntimeError("disk I/O error")
+
+        async def failing_rollback():
+            raise RuntimeError("connection broken")
+
+        try:
+            conn.executemany = failing_executemany
+            conn.rollback = failing_rollback
+
+            # Act
+            try:
+                await db.add_download(url="https://youtu.be/aaaaaaaaaaa", title="Lost", filename="lost.mp3")
+                failed = False
+            except RuntimeError:
+                failed = True
+
+            conn.executemany = real_executemany
+            conn.rollback = real_rollback
+            download_id = await asyncio.wait_for(
+                db.add_download(url="https://youtu.be/bbbbbbbbbbb", title="Kept", filename="kept.mp3"),
+                timeout=5
+            )
+            entry = await db.get_download_by_id(download_id)
+        finally:
+            await db.close()
+
+        # Assert
+        assert failed is True
+        assert entry["title"] == "Kept"
+
+    asyncio.run(scenario())
+
+
+def test_lookup_racing_delete_is_not_cached(tmp_path):
+    """
+    Test that a row fetched while a delete runs is not put back into the cache.
+    """
+    async def scenario():
+        # Arrange
+        db = Database(tmp_path / "history.db")
+
+        try:
+            download_id = await db.add_download(url="https://youtu.be/aaaaaaaaaaa", title="Gone", filename="gone.mp3")
+
+            # Act
+            lookup = asyncio.create_task(db.get_download_by_id(download_id))
+            await asyncio.sleep(0)
+            deleted = await db.delete_download(download_id)
+            await lookup
+            after = await db.get_download_by_id(download_id)
+        finally:
+            await db.close()
+
+        # Assert
+        assert deleted is True
+        assert download_id not in db._by_id_cache
+        assert after is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,152 @@
+"""
+Test file for main CLI module.
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from main import YouTubeAudioDownloaderCLI
+
+
+def test_iter_valid_urls_streams_unique_urls(tmp_path):
+    """
+    Test that URL files are filtered to unique valid URLs in file order.
+    """
+    # Arrange
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text(
+        "https://youtu.be/dQw4w9WgXcQ\n"
+        "\n"
+        "not a url\n"
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa\n"
+        "  https://youtu.be/dQw4w9WgXcQ  \n",
+        encoding='utf-8'
+    )
+    
+    # Act
+    urls = list(YouTubeAudioDownloaderCLI._iter_valid_urls(
+        YouTubeAudioDownloaderCLI._read_url_file(url_file)
+    ))
+    
+    # Assert
+    assert urls == [
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+    ]
+
+
+def test_progress_callback_skips_small_changes(capsys):
+    """
+    Test that progress redraws only when the percentage moves enough.
+    """
+    # Arrange
+    cli = YouTubeAudioDownloaderCLI()
+    
+    # Act
+    for percentage in (0.0, 0.2, 0.6, 0.7, 1.2):
+        cli.progress_callback({'status': 'downloading', 'percentage': percentage, 'speed': "1.0 MB/s"})
+    cli.progress_callback({'status': 'finished', 'filename': "a.webm"})
+    cli.progress_callback({'status': 'downloading', 'percentage': 0.1, 'speed': "1.0 MB/s"})
+    output = capsys.readouterr().out
+    
+    # Assert
+    assert output.count("🔄 Downloading") == 4
+    assert "0.6% - 1.0 MB/s" in output
+    assert "0.7%" not in output
+    assert "✅ Download completed: a.webm" in output
+
+
+def test_download_batch_output_order(capsys):
+    """
+    Test that buffered batch status lines come out in order with a summary.
+    """
+    # Arrange
+    class FakeDownloader:
+        def download_audio(self, url, info=None):
+            return {'success': not url.endswith("2"), 'filename': "song.mp3", 'error': "Download failed"}
+    
+    class Args:
+        metadata = False
+        info_only = False
+        continue_on_error = True
+    
+    cli = YouTubeAudioDownloaderCLI()
+    cli.downloader = FakeDownloader()
+    
+    # Act
+    exit_code = cli._download_batch(iter(["url1", "url2"]), Args)
+    output = capsys.readouterr().out
+    
+    # Assert
+    assert exit_code == 1
+    assert output.index("URL: url1") < output.index("✅ Downloaded: song.mp3") < output.index("URL: url2")
+    assert output.index("❌ Failed: Download failed") < output.index("📊 Batch completed:")
+    assert output.endswith("✅ Successful: 1\n❌ Failed: 1\n")
+
+
+def test_download_batch_parallel_stops_on_error(capsys):
+    """
+    Test that parallel batches keep each video's lines together and stop on errors.
+    """
+    # Arrange
+    started = []
+    started_at_failure = []
+    second_started = threading.Event()
+    
+    class FakeDownloader:
+        def download_audio(self, url, info=None):
+            started.append(url)
+            if url == "url1":
+                # Fail while url2 is still running, as a slow download would be
+                second_started.wait(timeout=5)
+                started_at_failure.extend(started)
+                raise RuntimeError("network down")
+            second_started.set()
+            time.sleep(0.05)
+            return {'success': True, 'filename': f"{url}.mp3"}
+    
+    class Args:
+        metadata = False
+        info_only = False
+        continue_on_error = False
+        jobs = 2
+    
+    cli = YouTubeAudioDownloaderCLI()
+    cli.downloader = FakeDownloader()
+    urls = [f"url{i}" for i in range(1, 101)]
+    
+    # Act
+    exit_code = cli._download_batch(iter(urls), Args)
+    output = capsys.readouterr().out
+    
+    # Assert
+    assert exit_code == 1
+    assert "🔗 URL: url1\n❌ Error: network down\n💥 Stopping batch download due to error.\n" in output
+    assert "url100" not in output
+    assert sorted(started) == sorted(started_at_failure) == ["url1", "url2"]
+    assert output.count("📹 Processing video") == output.count("🔗 URL:")
+    assert output.endswith("❌ Failed: 1\n")
+
+
+def test_static_help_matches_parser(monkeypatch, capsys):
+    """
+    Test that the --help fast path prints what argparse would.
+    """
+    # Arrange
+    monkeypatch.setenv("COLUMNS", "80")
+    parser = YouTubeAudioDownloaderCLI().create_parser()
+    
+    # Act
+    exit_code = YouTubeAudioDownloaderCLI().run(["--help"])
+    output = capsys.readouterr().out
+    
+    # Assert
+    assert exit_code == 0
+    assert output == parser.format_help()
@@ -3,14 +3,31 @@ Test file for metadata_extractor module.
 """
 
 import sys
+import time
+import logging
 from pathlib import Path
 
+import pytest
+
 # Add src to path for imports
 src_path = Path(__file__).parent.parent / "src"
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
-from metadata_extractor import MetadataExtractor
+from metadata_extractor import MetadataError, MetadataExtractor, MetadataTemplate
+from config import Config, PathConfig
+
+
+def make_extractor(base_dir):
+    """Return an extractor whose logs, downloads and metadata live under base_dir."""
+    config = Config()
+    config.paths = PathConfig(base_dir=base_dir)
+    extractor = MetadataExtractor(config)
+    # Log output must not reach the repository's logs/ directory
+    log_files = [Path(h.baseFilename) for h in extractor.logger.handlers
+                 if isinstance(h, logging.FileHandler)]
+    assert log_files and all(f.is_relative_to(Path(base_dir).resolve()) for f in log_files)
+    return extractor
 
 
 def test_format_duration():
@@ -24,6 +41,7 @@ def test_format_duration():
         (65, "01:05"),
         (3661, "01:01:01"),  # 1 hour, 1 minute, 1 second
         (3600, "01:00:00"),  # Exactly 1 hour
+        (59.9, "00:59"),  # Fractional seconds are truncated
     ]
     
     for seconds, expected in test_cases:
@@ -32,3 +50,390 @@ def test_format_duration():
         
         # Assert
         assert result == expected, f"Expected {expected} for {seconds} seconds, got {result}"
+
+
+def test_save_and_load_metadata_round_trip(tmp_path):
+    """
+    Test that saved metadata loads back unchanged, including non-ASCII text.
+    """
+    # Arrange
+    extractor = make_extractor(tmp_path)
+    metadata = {"video_info": {"title": "Café ☕", "view_count": 42, "tags": ["a", "b"]}}
+    
+    # Act
+    metadata_file = extractor.save_metadata(metadata, output_file=tmp_path / "nested" / "meta.json")
+    loaded = extractor.load_metadata(metadata_file)
+    
+    # Assert
+    assert loaded == metadata
+    assert "Café ☕" in metadata_file.read_text(encoding='utf-8')
+
+
+def test_load_metadata_rejects_invalid_json(tmp_path):
+    """
+    Test that a corrupt metadata file raises MetadataError.
+    """
+    # Arrange
+    extractor = make_extractor(tmp_path)
+    metadata_file = tmp_path / "meta.json"
+    metadata_file.write_text("{not json", encoding='utf-8')
+    
+    # Act / Assert
+    with pytest.raises(MetadataError, match="Invalid JSON"):
+        extractor.load_metadata(metadata_file)
+
+
+def test_batch_extract_keeps_url_order(monkeypatch, tmp_path):
+    """
+    Test that parallel batch extraction returns results in input order.
+    """
+    # Arrange
+    extractor = make_extractor(tmp_path)
+    urls = [f"url{i}" for i in range(6)]
+    
+    ydls = set()
+    
+    def fake_extract_and_save(self, url, ydl=None, fast=False):
+        ydls.add(id(ydl))
+        # Later URLs finish first
+        time.sleep(0.01 * (len(urls) - int(url[3:])))
+        if url == "url3":
+            raise MetadataError("boom")
+        return {"url": url}, Path(f"{url}.json")
+    
+    monkeypatch.setattr(MetadataExtractor, "extract_and_save", fake_extract_and_save)
+    
+    # Act
+    results = extractor.batch_extract(urls, max_workers=6)
+    
+    # Assert
+    assert [r['url'] for r in results] == urls
+    assert [r['success'] for r in results] == [True, True, True, False, True, True]
+    assert results[3]['error'] == "boom"
+    assert 1 <= len(ydls) <= 6
+    assert id(None) not in ydls
+
+
+def test_batch_extract_stop_on_error_keeps_finished_results(monkeypatch, tmp_path):
+    """
+    Test that stopping on an error still returns extractions that were already running.
+    """
+    # Arrange
+    import threading
+    extractor = make_extractor(tmp_path)
+    urls = [f"url{i}" for i in range(6)]
+    slow_started = threading.Event()
+    
+    def fake_extract_and_save(self, url, ydl=None, fast=False):
+        if url == "url0":
+            # Fail while url1 is still being extracted
+            slow_started.wait(timeout=5)
+            raise MetadataError("boom")
+        slow_started.set()
+        time.sleep(0.05)
+        return {"url": url}, Path(f"{url}.json")
+    
+    monkeypatch.setattr(MetadataExtractor, "extract_and_save", fake_extract_and_save)
+    
+    # Act
+    results = extractor.batch_extract(urls, stop_on_error=True, max_workers=2)
+    
+    # Assert
+    assert [r['url'] for r in results][:2] == ["url0", "url1"]
+    assert results[0]['success'] is False
+    assert results[1]['success'] is True
+    assert len(results) < len(urls)
+    assert [r['url'] for r in results] == sorted(r['url'] for r in results)
+
+
+def test_extract_info_uses_disk_cache(monkeypatch, tmp_path):
+    """
+    Test that repeat extractions are served from the cache until refreshed or cleared.
+    """
+    # Arrange
+    import metadata_extractor
+    fetches = []
+    
+    class FakeYoutubeDL:
+        sanitize_info = staticmethod(metadata_extractor.yt_dlp.YoutubeDL.sanitize_info)
+        
+        def __init__(self, opts):
+            pass
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+        
+        def extract_info(self, url, download=False, process=True):
+            fetches.append(url)
+            return {'id': "dQw4w9WgXcQ", 'title': f"Fetch {len(fetches)}"}
+    
+    monkeypatch.setattr(metadata_extractor.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    extractor = make_extractor(tmp_path)
+    url = "https://youtu.be/dQw4w9WgXcQ"
+    
+    # Act
+    first = extractor.extract_info(url)
+    cached = extractor.extract_info(url)
+    refreshed = extractor.refresh_metadata(url)
+    removed = extractor.clear_cache()
+    after_clear = extractor.extract_info(url)
+    
+    # Assert
+    assert first['title'] == cached['title'] == "Fetch 1"
+    assert refreshed['video_info']['title'] == "Fetch 2"
+    assert removed == 1
+    assert after_clear['title'] == "Fetch 3"
+    assert len(fetches) == 3
+
+
+def test_info_cache_expires_and_prunes(monkeypatch, tmp_path):
+    """
+    Test that stale cache files are deleted and the cache is capped on write.
+    """
+    # Arrange
+    import os
+    extractor = make_extractor(tmp_path)
+    monkeypatch.setattr(MetadataExtractor, "INFO_CACHE_MAX_FILES", 2)
+    cache_dir = extractor._cache_dir
+    stale = cache_dir / "stale.json"
+    extractor._write_cached_info(stale, {'id': "stale"})
+    old = time.time() - MetadataExtractor.INFO_CACHE_TTL - 1
+    os.utime(stale, (old, old))
+    
+    # Act
+    stale_info = extractor._read_cached_info(stale)
+    for index in range(3):
+        cache_file = cache_dir / f"video{index}.json"
+        extractor._write_cached_info(cache_file, {'id': f"video{index}"})
+        mtime = time.time() - 10 + index
+        os.utime(cache_file, (mtime, mtime))
+    extractor._write_cached_info(cache_dir / "video3.json", {'id': "video3"})
+    
+    # Assert
+    assert stale_info is None
+    assert not stale.exists()
+    assert sorted(p.name for p in cache_dir.iterdir()) == ["video2.json", "video3.json"]
+    assert extractor._read_cached_info(cache_dir / "video3.json")["id"] == "video3"
+
+
+def test_sanitize_filename():
+    """
+    Test that invalid characters are replaced and long names truncated.
+    """
+    # Arrange
+    name = 'a<b>c:d"e/f\\g|h?i*j'
+    
+    # Act
+    result = MetadataExtractor._sanitize_filename(name)
+    truncated = MetadataExtractor._sanitize_filename("x" * 150)
+    
+    # Assert
+    assert result == "a_b_c_d_e_f_g_h_i_j"
+    assert truncated == "x" * 100
+
+
+def test_apply_template_fills_fields_and_automatic_values():
+    """
+    Test that compiled templates resolve fields, literals and automatic dates.
+    """
+    # Arrange
+    template = {
+        "video": {"title": "%(title)s", "missing": "%(nope)s", "label": "fixed", "other": None,
+                  "summary": "%(title)s [%(id)s]", "broken": "%(title)d"},
+        "download_info": {"extracted_at": None, "download_date": None},
+        "empty": {},
+    }
+    info = {"title": "Song", "id": "dQw4w9WgXcQ"}
+    
+    # Act
+    result = MetadataTemplate.apply_template(template, info)
+    default = MetadataTemplate.apply_template(MetadataTemplate.DEFAULT_TEMPLATE, info)
+    
+    # Assert
+    assert result["video"] == {
+        "title": "Song", "missing": None, "label": "fixed", "other": None,
+        "summary": "Song [dQw4w9WgXcQ]", "broken": "%(title)d",
+    }
+    assert result["download_info"]["extracted_at"].startswith(result["download_info"]["download_date"])
+    assert result["empty"] == {}
+    assert default["video_info"]["id"] == "dQw4w9WgXcQ"
+    assert default["download_info"]["output_format"] == "mp3"
+    assert list(default) == list(MetadataTemplate.DEFAULT_TEMPLATE)
+
+
+def test_build_metadata_post_processing(tmp_path):
+    """
+    Test computed fields, tag normalization and templates without a video_info section.
+    """
+    # Arrange
+    extractor = make_extractor(tmp_path)
+    info = {
+        "id": "dQw4w9WgXcQ",
+        "webpage_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "duration": 65,
+        "filesize": 2048,
+        "tags": "a, b",
+    }
+    template = {"video_info": {"duration": "%(duration)s", "tags": "%(tags)s"},
+                "technical_info": {"filesize": "%(filesize)s"}}
+    
+    # Act
+    metadata = extractor.build_metadata(info, template)
+    bare = extractor.build_metadata(info, {"custom": {"id": "%(id)s"}})
+    
+    # Assert
+    assert metadata["video_info"]["duration_formatted"] == "01:05"
+    assert metadata["video_info"]["tags"] == ["a", "b"]
+    assert metadata["technical_info"]["filesize_formatted"] == "2.0 KB"
+    assert metadata["computed"]["video_id"] == "dQw4w9WgXcQ"
+    assert metadata["computed"]["has_tags"] is True
+    assert bare["computed"]["has_tags"] is False
+    assert bare["custom"] == {"id": "dQw4w9WgXcQ"}
+
+
+def test_format_filesize():
+    """
+    Test the _format_filesize static method across unit boundaries.
+    """
+    # Arrange
+    test_cases = [
+        (0, "0 B"),
+        (0.5, "0.5 B"),  # Below one byte, as for fractional estimates
+        (512, "512.0 B"),
+        (1024, "1.0 KB"),
+        (1536, "1.5 KB"),
+        (1048575, "1024.0 KB"),
+        (5 * 1024 ** 3, "5.0 GB"),
+        (2048 * 1024 ** 4, "2048.0 TB"),
+    ]
+    
+    for bytes_count, expected in test_cases:
+        # Act
+        result = MetadataExtractor._format_filesize(bytes_count)
+        
+        # Assert
+        assert result == expected, f"Expected {expected} for {bytes_count} bytes, got {result}"
+
+
+def test_extractors_share_log_handlers(tmp_path):
+    """
+    Test that constructing more extractors does not add log handlers.
+    """
+    # Arrange
+    first = make_extractor(tmp_path)
+    handlers = list(first.logger.handlers)
+    
+    # Act
+    for _ in range(3):
+        make_extractor(tmp_path)
+    
+    # Assert
+    assert first.logger.handlers == handlers
+
+
+def test_extractors_log_to_their_own_logs_dir(tmp_path):
+    """
+    Test that extractors configured with different logs_dir values write to separate files.
+    """
+    # Arrange
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = make_extractor(tmp_path / "a")
+    second = make_extractor(tmp_path / "b")
+    
+    # Act
+    first.logger.warning("from first")
+    second.logger.warning("from second")
+    for extractor in (first, second):
+        for handler in extractor.logger.handlers:
+            handler.flush()
+    
+    # Assert
+    first_log = (tmp_path / "a" / "logs" / "yt_downloader.log").read_text(encoding='utf-8')
+    second_log = (tmp_path / "b" / "logs" / "yt_downloader.log").read_text(encoding='utf-8')
+    assert "from first" in first_log and "from second" not in first_log
+    assert "from second" in second_log and "from first" not in second_log
+    assert make_extractor(tmp_path / "a").logger is first.logger
+
+
+def test_estimate_mp3_size():
+    """
+    Test the 320 kbps MP3 size estimate.
+    """
+    # Arrange
+    test_cases = [
+        (0, "Unknown"),
+        (None, "Unknown"),
+        (1, "40.0 KB"),
+        (180, "7.0 MB"),
+        (0.5, "20.0 KB"),
+    ]
+    
+    for duration, expected in test_cases:
+        # Act
+        result = MetadataExtractor._estimate_mp3_size(duration)
+        
+        # Assert
+        assert result == expected, f"Expected {expected} for {duration} seconds, got {result}"
+
+
+def test_load_large_metadata_file(tmp_path):
+    """
+    Test that metadata files above the mmap threshold load correctly.
+    """
+    # Arrange
+    extractor = make_extractor(tmp_path)
+    metadata = {"video_info": {"description": "é" * MetadataExtractor.MMAP_THRESHOLD}}
+    metadata_file = extractor.save_metadata(metadata, output_file=tmp_path / "large.json")
+    
+    # Act
+    loaded = extractor.load_metadata(metadata_file)
+    
+    # Assert
+    assert metadata_file.stat().st_size >= MetadataExtractor.MMAP_THRESHOLD
+    assert loaded == metadata
+
+
+def test_fast_extraction_skips_processing_and_cache(monkeypatch, tmp_path):
+    """
+    Test that fast mode uses the lighter options, skips technical info and is not cached.
+    """
+    # Arrange
+    import metadata_extractor
+    calls = []
+    
+    class FakeYoutubeDL:
+        sanitize_info = staticmethod(metadata_extractor.yt_dlp.YoutubeDL.sanitize_info)
+        
+        def __init__(self, opts):
+            self.opts = opts
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+        
+        def extract_info(self, url, download=False, process=True):
+            calls.append(('extractor_args' in self.opts, process))
+            return {'id': "dQw4w9WgXcQ", 'title': "Song", 'duration': 65,
+                    'webpage_url': "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+    
+    monkeypatch.setattr(metadata_extractor.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    extractor = make_extractor(tmp_path)
+    url = "https://youtu.be/dQw4w9WgXcQ"
+    
+    # Act
+    fast = extractor.extract_metadata(url, fast=True)
+    extractor.extract_metadata(url)
+    cached = extractor.extract_metadata(url, fast=True)
+    
+    # Assert
+    assert calls == [(True, False), (False, True)]
+    assert "technical_info" not in fast
+    assert fast["computed"]["duration_formatted"] == "01:05"
+    assert fast["computed"]["video_id"] == "dQw4w9WgXcQ"
+    assert cached["video_info"]["title"] == "Song"
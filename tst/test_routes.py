@@ -0,0 +1,167 @@
+"""
+Test file for api.routes module.
+"""
+
+import os
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from api import routes
+from api.models import ProgressUpdate
+
+
+class FakeDownloader:
+    """Downloader stand-in that reports progress from its worker thread."""
+
+    def download_audio(self, url, progress_callback=None, return_info=False):
+        for percentage in range(0, 100, 10):
+            progress_callback({'status': 'downloading', 'percentage': percentage})
+            time.sleep(0.01)
+        return {'success': False, 'error': 'Download failed'}
+
+
+def test_progress_is_pushed_to_subscribers(monkeypatch):
+    """
+    Test that progress hook updates reach an SSE subscriber until the task ends.
+    """
+    async def scenario():
+        # Arrange
+        monkeypatch.setattr(routes, "downloader", FakeDownloader())
+        monkeypatch.setattr(routes, "tasks", {'t1': {'task_id': 't1', 'status': 'pending', 'percentage': 0}})
+        response = await routes.get_progress('t1')
+
+        async def consume():
+            return [event async for event in response.body_iterator]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+
+        # Act
+        await routes.download_task('t1', "https://youtu.be/dQw4w9WgXcQ", None)
+        events = await consumer
+
+        # Assert
+        assert '"status":"pending"' in events[0]["data"]
+        assert '"status":"downloading"' in events[1]["data"]
+        assert '"status":"error"' in events[-1]["data"]
+        assert 't1' not in routes.subscribers
+
+    asyncio.run(scenario())
+
+
+def test_task_store_is_bounded(monkeypatch):
+    """
+    Test that creating tasks beyond MAX_TASKS evicts the oldest ones.
+    """
+    # Arrange
+    monkeypatch.setattr(routes, "tasks", {})
+    monkeypatch.setattr(routes, "MAX_TASKS", 2)
+
+    # Act
+    for task_id in ('t1', 't2', 't3'):
+        routes.create_task(task_id, status='pending')
+    routes.update_task('t1', status='finished')
+    routes.update_task('t3', status='downloading')
+
+    # Assert
+    assert list(routes.tasks) == ['t2', 't3']
+    assert routes.tasks['t3']['status'] == 'downloading'
+
+
+def test_find_latest_mp3(tmp_path):
+    """
+    Test that the most recently modified MP3 is picked with its size.
+    """
+    # Arrange
+    older = tmp_path / "older.mp3"
+    newer = tmp_path / "newer.mp3"
+    older.write_bytes(b"a" * 10)
+    newer.write_bytes(b"b" * 20)
+    (tmp_path / "notes.txt").write_text("not audio")
+    os.utime(older, (1_000_000, 1_000_000))
+
+    # Act
+    latest = routes.find_latest_mp3(tmp_path)
+    missing = routes.find_latest_mp3(tmp_path / "missing")
+
+    # Assert
+    assert latest == ("newer.mp3", 20)
+    assert missing is None
+
+
+def test_publish_drops_oldest_for_slow_subscribers(monkeypatch):
+    """
+    Test that a full subscriber queue keeps the newest updates, including the final one.
+    """
+    async def scenario():
+        # Arrange
+        monkeypatch.setattr(routes, "tasks", {'t1': {'task_id': 't1', 'status': 'downloading'}})
+        queue = asyncio.Queue(maxsize=2)
+        monkeypatch.setattr(routes, "subscribers", {'t1': [queue]})
+
+        # Act
+        for percentage in (10, 20, 30):
+            routes.update_task('t1', percentage=percentage)
+            routes.publish_progress('t1')
+        routes.update_task('t1', status='finished', percentage=100)
+        routes.publish_progress('t1')
+        statuses = [queue.get_nowait()[0] for _ in range(queue.qsize())]
+
+        # Assert
+        assert statuses == ['downloading', 'finished']
+
+    asyncio.run(scenario())
+
+
+def test_progress_snapshot_is_single_line(monkeypatch):
+    """
+    Test that serialized progress never contains raw line breaks that would split an SSE frame.
+    """
+    # Arrange
+    monkeypatch.setattr(routes, "tasks", {'t1': {'task_id': 't1', 'status': 'error', 'message': "line one\r\nline two"}})
+
+    # Act
+    status, data = routes.progress_snapshot('t1')
+
+    # Assert
+    assert status == 'error'
+    assert "\r" not in data and "\n" not in data
+    assert '"message":"line one\\r\\nline two"' in data
+
+
+def test_progress_snapshot_matches_model(monkeypatch):
+    """
+    Test that the hand-built SSE payload stays valid against the ProgressUpdate schema.
+    """
+    # Arrange
+    monkeypatch.setattr(routes, "tasks", {'t1': {
+        'task_id': 't1',
+        'status': 'downloading',
+        'percentage': 42.5,
+        'speed': "1.0 MB/s",
+        'url': "https://youtu.be/dQw4w9WgXcQ",
+        'created_at': 0.0
+    }})
+
+    # Act
+    _, data = routes.progress_snapshot('t1')
+    progress = ProgressUpdate.model_validate_json(data)
+
+    # Assert
+    assert progress.model_dump() == {
+        'task_id': 't1',
+        'status': 'downloading',
+        'percentage': 42.5,
+        'downloaded': None,
+        'total': None,
+        'speed': "1.0 MB/s",
+        'filename': None,
+        'message': None
+    }